@@ -0,0 +1,6 @@
+from .engine import Game, GameConfig, ShipMap, TaskEngine
+from .replay import GameRecorder, Replay, ReplayError
+from .scenario import Scenario, ScenarioError, load_scenario
+from .simulation import run_simulations
+from .wal import JournalError, WriteAheadLog
+from .server import GameServer
@@ -0,0 +1,138 @@
+import os
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .engine import (
+    SABOTAGE_CHANCE, SIGHTING_PROBABILITY, BufferedRenderer, Game, GameConfig, MovementEngine, NullRenderer,
+    ShipMap, VirtualClock, normalize_lobby
+)
+
+# --- Benchmarks ---
+BENCH_PHASES = ("setup", "sightings", "special_roles", "meeting", "fork", "vote", "start_game")
+
+def _timing_summary(samples):
+    """Median/mean/min of a list of durations in seconds, reported in microseconds."""
+    if not samples:
+        return {"calls": 0, "median_us": 0.0, "mean_us": 0.0, "min_us": 0.0}
+    ordered = sorted(samples)
+    mid = len(ordered) // 2
+    median = ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {"calls": len(ordered), "median_us": median * 1e6, "mean_us": sum(ordered) / len(ordered) * 1e6,
+            "min_us": ordered[0] * 1e6}
+
+def bench_movement(walkers=2000, ticks=200, rooms=500, rounds=20, seed=0):
+    """Median milliseconds per round to walk and to derive sightings, on a generated map."""
+    ship_map = ShipMap.generate(rooms, seed)
+    ship_map.next_hop_table()
+    engine = MovementEngine(ticks)
+    rng = np.random.default_rng(seed)
+    walk_times, sighting_times = [], []
+    for _ in range(rounds):
+        starts = rng.integers(0, rooms, size=walkers)
+        goals = rng.integers(0, rooms, size=(walkers, 4))
+        start = time.perf_counter()
+        trace = engine.walk(ship_map, starts, goals, rng, hunter=0, quarry=1)
+        walk_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        trace.sightings(np.flatnonzero(rng.random(walkers) < SIGHTING_PROBABILITY), rng)
+        sighting_times.append(time.perf_counter() - start)
+    return {"walkers": walkers, "ticks": ticks, "rooms": rooms,
+            "walk_ms": _timing_summary(walk_times)["median_us"] / 1000,
+            "sightings_ms": _timing_summary(sighting_times)["median_us"] / 1000}
+
+
+def _bench_case(num_players, num_impostors, sabotage_chance, rounds, games, seed, sink):
+    """Time each play_round phase over `rounds` rounds, and full start_game over `games` games."""
+    samples = {phase: [] for phase in BENCH_PHASES}
+    config = GameConfig(sabotage_chance=sabotage_chance)
+    seeds = random.Random(seed)
+    timer = time.perf_counter
+    quiet = NullRenderer()
+    loud = BufferedRenderer(sink, VirtualClock())
+    game = None
+    while len(samples["setup"]) < rounds:
+        if game is None or game.game_over:
+            game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64), renderer=quiet, config=config)
+            game._assign_roles()
+        game._announce_round()
+        start = timer()
+        ready = game._setup_round()
+        samples["setup"].append(timer() - start)
+        if ready:
+            game._impostor_sabotage_attempt()
+            start = timer()
+            game._generate_sightings()
+            samples["sightings"].append(timer() - start)
+            start = timer()
+            game._perform_special_roles_actions()
+            samples["special_roles"].append(timer() - start)
+            game.renderer = loud
+            start = timer()
+            game._present_information_for_meeting()
+            loud.flush()
+            samples["meeting"].append(timer() - start)
+            game.renderer = quiet
+            start = timer()
+            game.fork(seed=0)
+            samples["fork"].append(timer() - start)
+            start = timer()
+            ejected = game._get_player_vote()
+            samples["vote"].append(timer() - start)
+            game._close_round(ejected)
+        elif not game.game_over:
+            game._check_win_conditions()
+        game._check_stalemate()
+
+    for _ in range(games):
+        game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64), renderer=loud, config=config)
+        start = timer()
+        game.start_game()
+        loud.flush()
+        samples["start_game"].append(timer() - start)
+    return {phase: _timing_summary(times) for phase, times in samples.items()}
+
+
+def bench_case_key(num_players, num_impostors, sabotage_chance):
+    return f"players={num_players} impostors={num_impostors} sabotage={sabotage_chance:g}"
+
+
+def run_benchmarks(players=(7,), impostors=(1,), sabotage=(SABOTAGE_CHANCE,), rounds=200, games=20, seed=0):
+    """Benchmark every combination of the parameters; returns a JSON-ready report."""
+    cases = {}
+    with open(os.devnull, "w") as sink:
+        for num_players in players:
+            for num_impostors in impostors:
+                lobby = normalize_lobby(num_players, num_impostors)
+                for sabotage_chance in sabotage:
+                    key = bench_case_key(*lobby, sabotage_chance)
+                    if key in cases: # impostor counts that normalize to the same lobby
+                        continue
+                    phases = _bench_case(*lobby, sabotage_chance, rounds, games, seed, sink)
+                    cases[key] = {"players": lobby[0], "impostors": lobby[1], "sabotage": sabotage_chance,
+                                  "phases": phases}
+    return {"meta": {"python": sys.version.split()[0], "platform": sys.platform,
+                     "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "rounds": rounds, "games": games, "seed": seed},
+            "cases": cases}
+
+
+def compare_benchmarks(current, baseline, threshold=0.20, stat="median_us"):
+    """[(case, phase, baseline_us, current_us, ratio)] for phases slower than baseline by more than `threshold`."""
+    regressions = []
+    for key, case in current["cases"].items():
+        base_case = baseline.get("cases", {}).get(key)
+        if base_case is None:
+            continue
+        for phase, timing in case["phases"].items():
+            base = base_case["phases"].get(phase)
+            if not base or not base[stat] or not timing["calls"]:
+                continue
+            ratio = timing[stat] / base[stat]
+            if ratio > 1 + threshold:
+                regressions.append((key, phase, base[stat], timing[stat], ratio))
+    return regressions
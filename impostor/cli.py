@@ -0,0 +1,371 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .engine import (
+    SABOTAGE_CHANCE, STRATEGIES, GameConfig, ScaledClock, ShipMap, TaskEngine, TerminalRenderer
+)
+from .scenario import Scenario, load_scenario
+from .replay import Replay
+from .simulation import measure_memory, run_simulations
+from .records import summarize_records, write_records
+from .bench import bench_movement, compare_benchmarks, run_benchmarks
+from .solver import ExactSolver, cross_check
+from .sweeps import SweepCache, auto_balance, run_sweep
+from .tournament import run_tournament
+from .wal import bench_wal
+from .server import GameServer, run_load, run_spectator_load, watch_lobby
+
+# --- Command Line ---
+def _format_stats(stats):
+    summary = stats.to_dict()
+    lines = [f"Games: {summary['games']}  Crew win rate: {summary['crew_win_rate']:.4f}  Stalemates: {summary['stalemates']}",
+             "Rounds: " + ", ".join(f"{r}: {c}" for r, c in summary["round_histogram"].items()),
+             "Survival: " + ", ".join(f"{role} {rate:.3f}" for role, rate in summary["survival_rates"].items())]
+    return "\n".join(lines)
+
+
+def _format_benchmarks(report, baseline=None):
+    lines = []
+    for key, case in report["cases"].items():
+        lines.append(key)
+        base_phases = (baseline or {}).get("cases", {}).get(key, {}).get("phases", {})
+        for phase, timing in case["phases"].items():
+            line = f"  {phase:<14}{timing['median_us']:>12.1f} us median  ({timing['calls']} calls)"
+            base = base_phases.get(phase)
+            if base and base["median_us"]:
+                line += f"  x{timing['median_us'] / base['median_us']:.2f} vs baseline"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _parse_lobby(text):
+    players, _, impostors = text.partition(":")
+    return int(players), int(impostors or 1)
+
+
+def _parse_grid(specs):
+    grid = {}
+    for spec in specs:
+        field, _, values = spec.partition("=")
+        if field not in GameConfig.FIELDS:
+            raise ValueError(f"Unknown config field: {field}")
+        grid[field] = [float(value) for value in values.split(",")]
+    return grid
+
+
+def _format_sweep(points):
+    lines = []
+    for point in points:
+        overrides = ", ".join(f"{k}={v:g}" for k, v in point["config"].items()) or "defaults"
+        line = (f"{point['players']:>3}p/{point['impostors']}i  {point['crew_win_rate']:.4f} "
+                f"[{point['low']:.4f}, {point['high']:.4f}]  {point['games']:>7} games  {point['stop']:<9}  {overrides}")
+        if "reached" in point and not point["reached"]:
+            line += "  (target out of range)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _format_tournament(report):
+    lines = [f"{report['players']} players, {report['impostors']} impostor(s)", "Crew win rate (rows: crew, columns: impostors)"]
+    names = [row["strategy"] for row in report["crew"]]
+    rates = {(p["crew"], p["impostor"]): p["crew_win_rate"] for p in report["pairings"]}
+    lines.append(" " * 12 + "".join(f"{name:>12}" for name in names))
+    for crew in names:
+        lines.append(f"{crew:<12}" + "".join(f"{rates[(crew, impostor)]:>12.4f}" for impostor in names))
+    for side in ("crew", "impostor"):
+        lines.append(f"Best {side} strategies")
+        for row in report[side]:
+            lines.append(f"  {row['strategy']:<12}{row['win_rate']:.4f} [{row['low']:.4f}, {row['high']:.4f}]  {row['games']} games")
+    return "\n".join(lines)
+
+def run_command(argv):
+    parser = argparse.ArgumentParser(prog="Game-code.py", description="Headless tools for the impostor game. Run without arguments to play.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sim = commands.add_parser("simulate", help="play many headless games in parallel and print aggregates")
+    sim.add_argument("--games", type=int, default=10000)
+    sim.add_argument("--players", type=int, default=7)
+    sim.add_argument("--impostors", type=int, default=1)
+    sim.add_argument("--seed", type=int, default=0)
+    sim.add_argument("--workers", type=int, default=None)
+    sim.add_argument("--engine", choices=["scalar", "batch"], default="scalar")
+    sim.add_argument("--batch-size", type=int, default=None)
+    sim.add_argument("--rooms", type=int, default=None, help="play on a generated map with this many rooms")
+    sim.add_argument("--metrics", default=None, help="write phase metrics here (.json, else Prometheus text)")
+    sim.add_argument("--ticks", type=int, default=None, help="walk each round over this many movement ticks")
+    sim.add_argument("--scenario", default=None, help="play this scenario file's map, lobby and config")
+    sim.add_argument("--tasks", type=float, default=None, help="play to a task bar, working each task at this chance")
+
+    scen = commands.add_parser("scenario", help="validate and compile a scenario file, or export one")
+    scen.add_argument("path")
+    scen.add_argument("--cache-dir", default=None, help="where compiled scenarios are kept (default: .impostor-cache beside the file)")
+    scen.add_argument("--export", action="store_true", help="write a scenario file to path instead of loading it")
+    scen.add_argument("--rooms", type=int, default=None, help="with --export: a generated map with this many rooms")
+    scen.add_argument("--seed", type=int, default=0)
+
+    move = commands.add_parser("movement", help="time the movement engine on a large generated lobby")
+    move.add_argument("--walkers", type=int, default=2000)
+    move.add_argument("--ticks", type=int, default=200)
+    move.add_argument("--rooms", type=int, default=500)
+    move.add_argument("--rounds", type=int, default=20)
+    move.add_argument("--seed", type=int, default=0)
+
+    stream = commands.add_parser("stream", help="play a campaign and write per-game and per-round records as .npy chunks")
+    stream.add_argument("output", help="directory for the column chunks and manifest")
+    stream.add_argument("--games", type=int, default=100000)
+    stream.add_argument("--players", type=int, default=7)
+    stream.add_argument("--impostors", type=int, default=1)
+    stream.add_argument("--seed", type=int, default=0)
+    stream.add_argument("--workers", type=int, default=None)
+    stream.add_argument("--batch-size", type=int, default=500)
+    stream.add_argument("--chunk-rows", type=int, default=65536, help="rows per saved chunk")
+    stream.add_argument("--rooms", type=int, default=None, help="play on a generated map with this many rooms")
+
+    summarize = commands.add_parser("summarize", help="aggregate a directory written by 'stream', chunk by chunk")
+    summarize.add_argument("path")
+
+    bench = commands.add_parser("bench", help="time each round phase and full games; compare with a baseline")
+    bench.add_argument("--players", type=int, nargs="+", default=[7, 10])
+    bench.add_argument("--impostors", type=int, nargs="+", default=[1, 2])
+    bench.add_argument("--sabotage", type=float, nargs="+", default=[SABOTAGE_CHANCE])
+    bench.add_argument("--rounds", type=int, default=300, help="rounds timed per case")
+    bench.add_argument("--games", type=int, default=30, help="full start_game runs timed per case")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--output", default=None, help="write the results as JSON here")
+    bench.add_argument("--baseline", default=None, help="JSON results to compare against")
+    bench.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown before flagging (0.20 = 20%%)")
+    bench.add_argument("--stat", choices=["median", "min"], default="median", help="statistic compared with the baseline")
+
+    mem = commands.add_parser("memory", help="report bytes held per finished game")
+    mem.add_argument("--games", type=int, default=2000)
+    mem.add_argument("--players", type=int, default=10)
+    mem.add_argument("--impostors", type=int, default=2)
+    mem.add_argument("--seed", type=int, default=0)
+
+    serve = commands.add_parser("serve", help="host lobbies over TCP (newline-delimited JSON)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--pace", type=float, default=1.0, help="multiplier on pacing delays (0 = none)")
+    serve.add_argument("--vote-timeout", type=float, default=30.0)
+    serve.add_argument("--record-dir", default=None, help="save a replay of every finished lobby here")
+    serve.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics over HTTP on this port")
+    serve.add_argument("--wal-dir", default=None, help="journal running lobbies here and restore them after a restart")
+
+    wal = commands.add_parser("wal", help="measure write-ahead log throughput and recovery time")
+    wal.add_argument("directory", help="log directory (its contents are recovered first)")
+    wal.add_argument("--lobbies", type=int, default=200)
+    wal.add_argument("--games", type=int, default=2000)
+    wal.add_argument("--players", type=int, default=7)
+    wal.add_argument("--impostors", type=int, default=1)
+    wal.add_argument("--seed", type=int, default=0)
+    wal.add_argument("--commit-delay", type=float, default=0.0, help="seconds each batch is held open to gather more")
+
+    replay = commands.add_parser("replay", help="verify or re-render a recorded game")
+    replay.add_argument("path")
+    replay.add_argument("--from-round", type=int, default=1, help="fast-forward silently to this round")
+    replay.add_argument("--until-round", type=int, default=None)
+    replay.add_argument("--pace", type=float, default=0.0, help="multiplier on pacing delays (0 = none)")
+    replay.add_argument("--verify", action="store_true", help="replay headlessly and print the result")
+    replay.add_argument("--decisions", action="store_true", help="print the recorded decisions as JSON")
+
+    solve = commands.add_parser("solve", help="exact win probabilities by dynamic programming over game states")
+    solve.add_argument("--players", type=int, default=7)
+    solve.add_argument("--impostors", type=int, default=1)
+    solve.add_argument("--check", type=int, default=0, metavar="GAMES", help="also simulate this many games and compare")
+    solve.add_argument("--seed", type=int, default=0)
+    solve.add_argument("--workers", type=int, default=None)
+
+    default_engine = "batch" if np is not None else "scalar"
+    sweep = commands.add_parser("sweep", help="estimate the crew win rate over a grid of balance settings")
+    balance = commands.add_parser("balance", help="search one balance setting for a target crew win rate")
+    for tuning in (sweep, balance):
+        tuning.add_argument("--lobby", action="append", type=_parse_lobby, default=None, metavar="P:I",
+                            help="lobby size as players:impostors (repeatable; default 7:1 and 10:2)")
+        tuning.add_argument("--target", type=float, default=0.5 if tuning is balance else None, help="crew win rate to aim for")
+        tuning.add_argument("--tolerance", type=float, default=0.02, help="accepted distance from the target")
+        tuning.add_argument("--confidence", type=float, default=0.95)
+        tuning.add_argument("--precision", type=float, default=0.01, help="stop once the interval is this narrow (half-width)")
+        tuning.add_argument("--chunk", type=int, default=2000, help="games played between stopping checks")
+        tuning.add_argument("--max-games", type=int, default=200000, help="games per point at most")
+        tuning.add_argument("--engine", choices=["scalar", "batch"], default=default_engine)
+        tuning.add_argument("--seed", type=int, default=0)
+        tuning.add_argument("--workers", type=int, default=None)
+        tuning.add_argument("--cache", default=None, help="JSON-lines file of evaluated points; reruns resume from it")
+        tuning.add_argument("--output", default=None, help="write the results as JSON here")
+    sweep.add_argument("--param", action="append", default=[], metavar="FIELD=V1,V2",
+                       help=f"values to try for a config field (repeatable): {', '.join(GameConfig.FIELDS)}")
+    balance.add_argument("--param", required=True, choices=list(GameConfig.FIELDS))
+    balance.add_argument("--low", type=float, default=0.0)
+    balance.add_argument("--high", type=float, default=1.0)
+    balance.add_argument("--resolution", type=float, default=0.01, help="stop bisecting once the range is this narrow")
+
+    tournament = commands.add_parser("tournament", help="pit voting strategies against each other over seeded games")
+    tournament.add_argument("--strategies", nargs="+", default=list(STRATEGIES), help=f"from: {', '.join(STRATEGIES)}")
+    tournament.add_argument("--players", type=int, default=7)
+    tournament.add_argument("--impostors", type=int, default=1)
+    tournament.add_argument("--games", type=int, default=2000, help="games per pairing")
+    tournament.add_argument("--seed", type=int, default=0)
+    tournament.add_argument("--workers", type=int, default=None)
+    tournament.add_argument("--batch-size", type=int, default=500)
+    tournament.add_argument("--confidence", type=float, default=0.95)
+    tournament.add_argument("--output", default=None, help="write the results as JSON here")
+
+    load = commands.add_parser("loadgen", help="drive many concurrent lobbies against a running server")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=8765)
+    load.add_argument("--lobbies", type=int, default=200)
+    load.add_argument("--players", type=int, default=7)
+    load.add_argument("--impostors", type=int, default=1)
+    load.add_argument("--think-time", type=float, default=0.0)
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--viewers", type=int, default=0, help="spectators per lobby; measures broadcast cost instead")
+    load.add_argument("--late", type=float, default=0.5, help="share of spectators that join mid-game")
+
+    watch = commands.add_parser("watch", help="spectate a lobby on a running server, printing its frames as JSON")
+    watch.add_argument("lobby", type=int)
+    watch.add_argument("--host", default="127.0.0.1")
+    watch.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        lobby, config = (args.players, args.impostors), None
+        if args.scenario:
+            scenario = load_scenario(args.scenario)
+            lobby, config = (scenario.num_players, scenario.num_impostors), scenario.config
+        start = time.perf_counter()
+        stats = run_simulations(args.games, *lobby, args.seed, args.workers, args.engine, args.batch_size, args.rooms,
+                                metrics=bool(args.metrics), config=config, movement_ticks=args.ticks, scenario=args.scenario,
+                                task_engine=None if args.tasks is None else TaskEngine(work_chance=args.tasks))
+        elapsed = time.perf_counter() - start
+        print(_format_stats(stats))
+        print(f"{stats.games / elapsed:.0f} games/s over {elapsed:.2f}s")
+        if args.metrics:
+            stats.metrics.write(args.metrics)
+    elif args.command == "scenario":
+        if args.export:
+            ship_map = ShipMap.generate(args.rooms, args.seed) if args.rooms else ShipMap()
+            with open(args.path, "w") as f:
+                json.dump(Scenario(ship_map, name=os.path.splitext(os.path.basename(args.path))[0]).to_definition(), f, indent=1)
+            print(f"Wrote {args.path}")
+            return
+        timings = []
+        for _ in range(2): # the first load compiles unless the cache already has it
+            start = time.perf_counter()
+            scenario = load_scenario(args.path, args.cache_dir)
+            timings.append((time.perf_counter() - start) * 1000)
+        corridors = sum(len(adj) for adj in scenario.ship_map.neighbours.values()) // 2
+        print(f"{scenario.name}: {len(scenario.ship_map)} rooms, {corridors} corridors, "
+              f"{scenario.num_players} players, {scenario.num_impostors} impostor(s), config {scenario.config.changes() or 'defaults'}")
+        print(f"Compiled: {scenario.compiled_path}")
+        print(f"Load: {timings[0]:.1f} ms first, {timings[1]:.1f} ms cached")
+    elif args.command == "movement":
+        print(json.dumps(bench_movement(args.walkers, args.ticks, args.rooms, args.rounds, args.seed), indent=2))
+    elif args.command == "stream":
+        start = time.perf_counter()
+        written = write_records(args.output, args.games, args.players, args.impostors, args.seed, args.workers,
+                                args.batch_size, args.chunk_rows, args.rooms)
+        elapsed = time.perf_counter() - start
+        print(f"Wrote {written['games']} games and {written['rounds']} rounds to {args.output} "
+              f"({written['games'] / elapsed:.0f} games/s)")
+    elif args.command == "summarize":
+        print(json.dumps(summarize_records(args.path), indent=2))
+    elif args.command == "bench":
+        report = run_benchmarks(args.players, args.impostors, args.sabotage, args.rounds, args.games, args.seed)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        print(_format_benchmarks(report, baseline))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        if baseline is not None:
+            regressions = compare_benchmarks(report, baseline, args.threshold, f"{args.stat}_us")
+            for key, phase, before, after, ratio in regressions:
+                print(f"REGRESSION {key} {phase}: {before:.1f} us -> {after:.1f} us (x{ratio:.2f})")
+            if regressions:
+                return 1
+    elif args.command == "memory":
+        report = measure_memory(args.games, args.players, args.impostors, args.seed)
+        print(json.dumps(report, indent=2))
+        if not report["player_target_met"]:
+            print(f"Per-player target not met: {report['bytes_per_player']:.0f} bytes per player, "
+                  f"{report['bytes_per_player_before'] / report['bytes_per_player']:.1f}x less than "
+                  f"{report['bytes_per_player_before']} (target {report['bytes_per_player_target']:.0f})")
+    elif args.command == "serve":
+        if args.record_dir:
+            os.makedirs(args.record_dir, exist_ok=True)
+        server = GameServer(args.host, args.port, args.pace, args.vote_timeout, args.record_dir, args.metrics_port,
+                            args.wal_dir)
+        print(f"Serving lobbies on {args.host}:{args.port}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "wal":
+        report = asyncio.run(bench_wal(args.directory, args.lobbies, args.games, args.players, args.impostors, args.seed,
+                                       args.commit_delay))
+        print(json.dumps(report, indent=2))
+    elif args.command == "replay":
+        recording = Replay.load(args.path)
+        if args.decisions:
+            print(json.dumps(recording.decisions(), indent=1))
+        elif args.verify:
+            start = time.perf_counter()
+            print(recording.verify())
+            print(f"Replayed and verified in {time.perf_counter() - start:.3f}s")
+        else:
+            recording.play(TerminalRenderer(clock=ScaledClock(args.pace)), args.from_round, args.until_round)
+    elif args.command == "solve":
+        start = time.perf_counter()
+        exact = ExactSolver().solve(args.players, args.impostors)
+        elapsed = time.perf_counter() - start
+        print(json.dumps(exact, indent=2))
+        print(f"Solved in {elapsed * 1000:.1f} ms")
+        if args.check:
+            check = cross_check(args.players, args.impostors, args.check, args.seed, workers=args.workers)
+            print(f"Simulated {check['games']} games: crew win rate {check['simulated_crew_win_rate']:.4f} "
+                  f"(z={check['crew_win_z']:+.2f}), mean rounds {check['simulated_expected_rounds']:.3f} "
+                  f"(z={check['rounds_z']:+.2f})")
+    elif args.command in ("sweep", "balance"):
+        evaluate = {"tolerance": args.tolerance, "confidence": args.confidence, "precision": args.precision,
+                    "chunk": args.chunk, "max_games": args.max_games, "engine": args.engine, "seed": args.seed,
+                    "cache": SweepCache(args.cache), "workers": args.workers}
+        lobbies = args.lobby or [(7, 1), (10, 2)]
+        if args.command == "sweep":
+            results = run_sweep(_parse_grid(args.param), lobbies, target=args.target, **evaluate)
+        else:
+            results = auto_balance(args.param, args.low, args.high, lobbies, args.target, resolution=args.resolution, **evaluate)
+        print(_format_sweep(results))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    elif args.command == "tournament":
+        start = time.perf_counter()
+        report = run_tournament(args.strategies, args.players, args.impostors, args.games, args.seed, args.workers,
+                                args.batch_size, args.confidence)
+        elapsed = time.perf_counter() - start
+        print(_format_tournament(report))
+        total_games = sum(pairing["games"] for pairing in report["pairings"])
+        print(f"{total_games / elapsed:.0f} games/s over {elapsed:.2f}s")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+    elif args.command == "loadgen":
+        if args.viewers:
+            report = asyncio.run(run_spectator_load(args.host, args.port, args.lobbies, args.viewers, args.late,
+                                                    args.players, args.impostors, args.seed))
+        else:
+            report = asyncio.run(run_load(args.host, args.port, args.lobbies, args.players, args.impostors,
+                                          args.think_time, args.seed))
+        print(json.dumps(report, indent=2))
+    elif args.command == "watch":
+        asyncio.run(watch_lobby(args.host, args.port, args.lobby, on_entry=lambda entry: print(json.dumps(entry))))
@@ -0,0 +1,218 @@
+import json
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .engine import (
+    EVENT_EJECTION, EVENT_KILL, EVENT_SABOTAGE, EVENT_SIGHTING, EVENT_VOTE, ROLE_CODES, WINNER_CODES,
+    WINNER_CREW, Game, GameConfig, ShipMap, derive_seed, normalize_lobby
+)
+
+# --- Streaming Records ---
+# Campaigns stream one game row and one row per round into fixed-size column chunks:
+# <dir>/<table>-<chunk>.<column>.npy, plus manifest.json listing the schema and the rows
+# in each chunk. Players, rooms and roles are stored as indices (ROLE_CODES, WINNER_CODES,
+# ship map room order); -1 means none. Readers memory-map one chunk at a time.
+RECORDS_MANIFEST = "manifest.json"
+
+def record_tables(num_players):
+    """{table: [(column, dtype, per-row shape)]} for a campaign of num_players lobbies."""
+    return {
+        "games": [("seed", "u8", ()), ("winner", "i1", ()), ("rounds", "i2", ()), ("stalemate", "?", ()),
+                  ("roles", "i1", (num_players,)), ("alive", "?", (num_players,))],
+        "rounds": [("game", "i8", ()), ("round", "i2", ()), ("victim", "i4", ()), ("victim_role", "i1", ()),
+                   ("murder_room", "i2", ()), ("sabotage", "?", ()), ("sightings", "i2", ()),
+                   ("votes", "i2", (num_players,)), ("ejected", "i4", ()), ("ejected_role", "i1", ())],
+    }
+
+
+def game_records(game):
+    """(game row, [round rows]) for a finished Game, in the columns of record_tables()."""
+    index = {player: i for i, player in enumerate(game.players)}
+    by_name = game._players_by_name
+    room_index = game.ship_map.room_index
+    game_row = (game.seed or 0, WINNER_CODES[game.winner], game.round_num, game.stalemate,
+                [ROLE_CODES[p.role] for p in game.players], [p.is_alive for p in game.players])
+    round_rows = []
+    for round_num in range(1, game.round_num + 1):
+        victim, victim_role, murder_room = -1, -1, -1
+        for event in game.events.of_kind(EVENT_KILL, round_num):
+            victim, victim_role, murder_room = index[event.data[0]], ROLE_CODES[event.data[1]], room_index[event.data[2]]
+        votes = [0] * len(game.players)
+        for event in game.events.of_kind(EVENT_VOTE, round_num):
+            for target in event.data[0].values():
+                votes[index[by_name[target.lower()]]] += 1
+        ejected, ejected_role = -1, -1
+        for event in game.events.of_kind(EVENT_EJECTION, round_num):
+            if event.data[0] is not None:
+                ejected, ejected_role = index[event.data[0]], ROLE_CODES[event.data[1]]
+        round_rows.append((round_num, victim, victim_role, murder_room,
+                           bool(game.events.of_kind(EVENT_SABOTAGE, round_num)),
+                           len(game.events.of_kind(EVENT_SIGHTING, round_num)), votes, ejected, ejected_role))
+    return game_row, round_rows
+
+
+def _record_batch(task):
+    """Worker entry point: play one seeded batch, seeded like _run_simulation_batch, and return its records."""
+    num_players, num_impostors, num_games, seed, num_rooms, config = task
+    ship_map = ShipMap.generate(num_rooms) if num_rooms else ShipMap()
+    seeds = random.Random(seed)
+    records = []
+    for _ in range(num_games):
+        game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64), ship_map=ship_map, config=config)
+        game.simulate()
+        records.append(game_records(game))
+    return records
+
+
+def stream_records(num_games, num_players=7, num_impostors=1, master_seed=0, workers=1, batch_size=500,
+                   num_rooms=None, config=None):
+    """Yield (game row, round rows) for num_games headless games, in order, as they finish."""
+    tasks = ((num_players, num_impostors, min(batch_size, num_games - start), derive_seed(master_seed, index), num_rooms, config)
+             for index, start in enumerate(range(0, num_games, batch_size)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield from _record_batch(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_record_batch, task))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+class ColumnarWriter:
+    """Appends rows into preallocated NumPy chunks and saves each full chunk as .npy files."""
+    def __init__(self, directory, tables, chunk_rows=65536, meta=None):
+        if np is None:
+            raise ImportError("ColumnarWriter requires NumPy (pip install numpy)")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.tables = tables
+        self.chunk_rows = chunk_rows
+        self.meta = meta or {}
+        self.buffers = {table: {name: np.zeros((chunk_rows,) + shape, dtype=dtype) for name, dtype, shape in columns}
+                        for table, columns in tables.items()}
+        self.filled = {table: 0 for table in tables}
+        self.chunks = {table: [] for table in tables} # rows per saved chunk
+
+    def append(self, table, row):
+        pos = self.filled[table]
+        for (name, _, _), value in zip(self.tables[table], row):
+            self.buffers[table][name][pos] = value
+        self.filled[table] = pos + 1
+        if pos + 1 == self.chunk_rows:
+            self._save(table)
+
+    def _save(self, table):
+        rows = self.filled[table]
+        if not rows:
+            return
+        chunk = len(self.chunks[table])
+        for name, column in self.buffers[table].items():
+            np.save(os.path.join(self.directory, f"{table}-{chunk:06d}.{name}.npy"), column[:rows])
+        self.chunks[table].append(rows)
+        self.filled[table] = 0
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {"meta": self.meta, "tables": {
+            table: {"columns": [[name, dtype, list(shape)] for name, dtype, shape in columns], "chunks": self.chunks[table]}
+            for table, columns in self.tables.items()}}
+        path = os.path.join(self.directory, RECORDS_MANIFEST)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(f"{path}.tmp", path)
+
+    def close(self):
+        for table in self.tables:
+            self._save(table)
+        self._write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_records(directory, num_games, num_players=7, num_impostors=1, master_seed=0, workers=1, batch_size=500,
+                  chunk_rows=65536, num_rooms=None, config=None):
+    """Stream a campaign into `directory`; returns the games and rounds written."""
+    num_players, num_impostors = normalize_lobby(num_players, num_impostors)
+    meta = {"players": num_players, "impostors": num_impostors, "seed": master_seed, "batch_size": batch_size,
+            "rooms": num_rooms, "config": (config or GameConfig()).changes()}
+    games = rounds = 0
+    with ColumnarWriter(directory, record_tables(num_players), chunk_rows, meta) as writer:
+        for game_row, round_rows in stream_records(num_games, num_players, num_impostors, master_seed, workers,
+                                                   batch_size, num_rooms, config):
+            writer.append("games", game_row)
+            for round_row in round_rows:
+                writer.append("rounds", (games,) + round_row)
+            games += 1
+            rounds += len(round_rows)
+    return {"games": games, "rounds": rounds}
+
+
+class ColumnarReader:
+    """Memory-mapped access to a directory written by ColumnarWriter, one chunk at a time."""
+    def __init__(self, directory):
+        if np is None:
+            raise ImportError("ColumnarReader requires NumPy (pip install numpy)")
+        self.directory = directory
+        with open(os.path.join(directory, RECORDS_MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.meta = self.manifest["meta"]
+
+    def rows(self, table):
+        return sum(self.manifest["tables"][table]["chunks"])
+
+    def chunks(self, table, columns=None):
+        """Yield {column: memory-mapped array} for each chunk of `table`."""
+        spec = self.manifest["tables"][table]
+        names = columns or [name for name, _, _ in spec["columns"]]
+        for chunk in range(len(spec["chunks"])):
+            yield {name: np.load(os.path.join(self.directory, f"{table}-{chunk:06d}.{name}.npy"), mmap_mode="r")
+                   for name in names}
+
+
+def summarize_records(directory):
+    """Campaign aggregates computed chunk by chunk, in constant memory."""
+    reader = ColumnarReader(directory)
+    games = crew_wins = stalemates = 0
+    round_histogram = {}
+    for chunk in reader.chunks("games", ["winner", "rounds", "stalemate"]):
+        games += len(chunk["winner"])
+        crew_wins += int((chunk["winner"] == WINNER_CODES[WINNER_CREW]).sum())
+        stalemates += int(chunk["stalemate"].sum())
+        counts = np.bincount(chunk["rounds"])
+        for rounds in np.flatnonzero(counts).tolist():
+            round_histogram[rounds] = round_histogram.get(rounds, 0) + int(counts[rounds])
+    rounds = sightings = sabotages = 0
+    ejections = {role: 0 for role in ROLE_CODES}
+    top_vote_share = 0.0
+    for chunk in reader.chunks("rounds", ["sightings", "sabotage", "votes", "ejected_role"]):
+        rounds += len(chunk["sightings"])
+        sightings += int(chunk["sightings"].sum(dtype=np.int64))
+        sabotages += int(chunk["sabotage"].sum())
+        votes = chunk["votes"]
+        cast = votes.sum(axis=1)
+        top_vote_share += float((votes.max(axis=1) / np.maximum(cast, 1)).sum())
+        for role, code in ROLE_CODES.items():
+            ejections[role] += int((chunk["ejected_role"] == code).sum())
+    return {"games": games, "crew_win_rate": crew_wins / games if games else 0.0, "stalemates": stalemates,
+            "round_histogram": dict(sorted(round_histogram.items())), "rounds": rounds,
+            "mean_sightings_per_round": sightings / rounds if rounds else 0.0,
+            "sabotage_rate": sabotages / rounds if rounds else 0.0,
+            "mean_top_vote_share": top_vote_share / rounds if rounds else 0.0,
+            "ejections": ejections}
@@ -0,0 +1,310 @@
+import json
+
+from .engine import (
+    EVENT_DETECTIVE_CLUE, EVENT_EJECTION, EVENT_HUMAN_VOTE, EVENT_KILL, EVENT_MEDIC_SCAN, EVENT_NOTE,
+    EVENT_NO_SIGHTINGS, EVENT_REPORT, EVENT_ROUND_START, EVENT_SABOTAGE, EVENT_SIGHTING, EVENT_VOTE,
+    ROLE_CODES, SABOTAGES, SIGHTING_TIMES, Game, GameConfig, MovementEngine, NullRenderer, ShipMap,
+    TaskEngine
+)
+
+# --- Replays ---
+# A recording is REPLAY_MAGIC, a version byte, a varint-length JSON header (seed, lobby,
+# map fingerprint) and a body of records: one kind byte followed by varint fields. The
+# body opens with the roles; every later record is one event from the game's log, with
+# players, rooms, roles and phrases stored as indices. Rounds are implicit: each
+# round_start record begins the next round.
+REPLAY_MAGIC = b"IMPR"
+REPLAY_VERSION = 1
+RECORD_ROLES = 0
+REPLAY_KINDS = [EVENT_ROUND_START, EVENT_KILL, EVENT_REPORT, EVENT_SIGHTING, EVENT_NO_SIGHTINGS, EVENT_SABOTAGE,
+                EVENT_MEDIC_SCAN, EVENT_DETECTIVE_CLUE, EVENT_VOTE, EVENT_EJECTION, EVENT_NOTE, EVENT_HUMAN_VOTE]
+REPLAY_CODES = {kind: code for code, kind in enumerate(REPLAY_KINDS, start=1)}
+EJECTION_REASONS = ["vote", "tie", "no majority"]
+
+# Field names of each record; a player, room, role or phrase field holds its index.
+# "maybe_player" fields store index + 1, with 0 for None. Votes are a count then pairs.
+REPLAY_FIELDS = {
+    EVENT_ROUND_START: (),
+    EVENT_KILL: ("victim", "role", "room", "location"),
+    EVENT_REPORT: ("reporter",),
+    EVENT_SIGHTING: ("seer", "seen", "room", "when", "body"),
+    EVENT_NO_SIGHTINGS: (),
+    EVENT_SABOTAGE: ("sabotage",),
+    EVENT_MEDIC_SCAN: ("investigator", "target", "suspicious"),
+    EVENT_DETECTIVE_CLUE: ("investigator", "target", "suspicious"),
+    EVENT_VOTE: None,
+    EVENT_EJECTION: ("maybe_player", "reason"),
+    EVENT_NOTE: (),
+    EVENT_HUMAN_VOTE: ("player", "maybe_target", "timed_out"),
+}
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def record_fields(game, index, event):
+    """The varint fields of an event's record, with players as their `index` entries."""
+    data = event.data
+    room_index = game.ship_map.room_index
+    kind = event.kind
+    if kind == EVENT_KILL:
+        return index[data[0]], ROLE_CODES[data[1]], room_index[data[2]], room_index[data[3]]
+    if kind == EVENT_REPORT:
+        return (index[data[0]],)
+    if kind == EVENT_SIGHTING:
+        return index[data[0]], index[data[1]], room_index[data[2]], SIGHTING_TIMES.index(data[3]), int(data[4])
+    if kind == EVENT_SABOTAGE:
+        return (SABOTAGES.index(data[0]),)
+    if kind in (EVENT_MEDIC_SCAN, EVENT_DETECTIVE_CLUE):
+        clue = data[0]
+        return index[clue.investigator], index[clue.target], int(clue.suspicious)
+    if kind == EVENT_VOTE:
+        fields = [len(data[0])]
+        for voter, target in data[0].items():
+            fields += [index[game.get_player_by_name(voter)], index[game.get_player_by_name(target)]]
+        return fields
+    if kind == EVENT_EJECTION:
+        return (index[data[0]] + 1 if data[0] is not None else 0), EJECTION_REASONS.index(data[2])
+    if kind == EVENT_HUMAN_VOTE:
+        return index[data[0]], (index[data[1]] + 1 if data[1] is not None else 0), int(data[2])
+    return ()
+
+
+def pack_recording(header, body):
+    """A recording's bytes from its encoded JSON header and its body."""
+    out = bytearray(REPLAY_MAGIC)
+    out.append(REPLAY_VERSION)
+    write_varint(out, len(header))
+    return bytes(out + header + body)
+
+
+class ReplayError(ValueError):
+    """A recording is malformed, or the game no longer makes the recorded decisions."""
+
+
+class GameRecorder:
+    """Records a game as its seed plus a compact binary stream of its decisions."""
+    def __init__(self, game, expected=None, body=None, on_record=None):
+        if game.seed is None:
+            raise ReplayError("Only games created from a seed (not an injected rng) can be recorded")
+        if game.strategies:
+            raise ReplayError("Games with voting strategies cannot be recorded")
+        self.game = game
+        self.body = bytearray(body or b"") # continues a recording of the history so far (Replay.resume)
+        self.expected = expected # a body to check each record against instead, raising at the first difference
+        self.on_record = on_record # called with the bytes of each record as it is made
+        self._index = {player: i for i, player in enumerate(game.players)} if self.body else None
+        game.events.subscribe(self._on_event)
+
+    def _on_event(self, event):
+        start = len(self.body)
+        if self._index is None: # roles are settled by the first event
+            self._index = {player: i for i, player in enumerate(self.game.players)}
+            self.body.append(RECORD_ROLES)
+            for player in self.game.players:
+                write_varint(self.body, ROLE_CODES[player.role])
+        self.body.append(REPLAY_CODES[event.kind])
+        for value in record_fields(self.game, self._index, event):
+            write_varint(self.body, value)
+        if self.expected is not None and self.body[start:] != self.expected[start:len(self.body)]:
+            raise ReplayError(f"Game diverged from the recording at event {event.seq} ({event.kind}, round {event.round})")
+        if self.on_record is not None:
+            self.on_record(bytes(self.body[start:]))
+
+    def header(self):
+        header = {"seed": self.game.seed, "players": self.game.num_players, "impostors": self.game.num_impostors,
+                  "headless": self.game.headless, "map": self.game.ship_map.fingerprint(),
+                  "config": self.game.config.changes()}
+        if self.game.movement is not None:
+            header["movement"] = self.game.movement.settings()
+        if self.game.tasks is not None:
+            header["tasks"] = self.game.tasks.settings()
+        return header
+
+    def getvalue(self):
+        return pack_recording(json.dumps(self.header(), separators=(",", ":")).encode(), self.body)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.getvalue())
+
+
+class ReplayGame(Game):
+    """A Game rebuilt from a recording and checked against it as it replays."""
+    def __init__(self, replay, renderer=None):
+        header = replay.header
+        super().__init__(header["players"], header["impostors"], headless=header["headless"], seed=header["seed"],
+                         renderer=renderer if renderer is not None else NullRenderer(), ship_map=replay.ship_map,
+                         config=GameConfig.from_dict(header.get("config", {})),
+                         movement=MovementEngine(**header["movement"]) if "movement" in header else None,
+                         tasks=TaskEngine(**header["tasks"]) if "tasks" in header else None)
+        self.human_votes = replay.human_votes()
+        self.verifier = GameRecorder(self, expected=replay.body)
+
+    def _ask_human_vote(self, human_player_name, alive_for_voting, ai_votes):
+        if self.round_num not in self.human_votes:
+            raise ReplayError(f"No recorded human vote for round {self.round_num}")
+        target_name, timed_out = self.human_votes[self.round_num]
+        human = self.get_player_by_name(human_player_name)
+        if timed_out: # the server fell back to the AI vote, drawing from the game's rng
+            target_name = self._choose_ai_vote(human, alive_for_voting, self.rng.random())
+        else:
+            self._show_vote_prompt(human_player_name, alive_for_voting)
+        ai_votes[human_player_name] = target_name
+        self.events.append(EVENT_HUMAN_VOTE, self.round_num, human, self.get_player_by_name(target_name or ""), timed_out)
+
+
+class Replay:
+    """A loaded recording: decode its decisions directly, or replay, seek and re-render it."""
+    def __init__(self, data, ship_map=None):
+        if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+            raise ReplayError("Not a game recording")
+        if data[len(REPLAY_MAGIC)] != REPLAY_VERSION:
+            raise ReplayError(f"Unsupported recording version {data[len(REPLAY_MAGIC)]}")
+        length, pos = read_varint(data, len(REPLAY_MAGIC) + 1)
+        self.header = json.loads(bytes(data[pos:pos + length]))
+        self.body = bytes(data[pos + length:])
+        self.ship_map = ship_map if ship_map is not None else ShipMap.default()
+        if self.ship_map.fingerprint() != self.header["map"]:
+            raise ReplayError("Recording was made on a different ship map")
+        self.records = self._decode()
+        self.rounds = max((round_num for round_num, _, _ in self.records), default=0)
+
+    @classmethod
+    def load(cls, path, ship_map=None):
+        with open(path, "rb") as f:
+            return cls(f.read(), ship_map)
+
+    def _decode(self):
+        """[(round, kind, fields)] for every record, with indices still unresolved."""
+        records, pos, round_num, body = [], 0, 0, self.body
+        try:
+            while pos < len(body):
+                code = body[pos]
+                pos += 1
+                if code == RECORD_ROLES:
+                    roles = []
+                    for _ in range(self.header["players"]):
+                        value, pos = read_varint(body, pos)
+                        roles.append(value)
+                    records.append((0, "roles", roles))
+                    continue
+                kind = REPLAY_KINDS[code - 1]
+                if kind == EVENT_ROUND_START:
+                    round_num += 1
+                names = REPLAY_FIELDS[kind]
+                if names is None: # votes
+                    count, pos = read_varint(body, pos)
+                    values = []
+                    for _ in range(2 * count):
+                        value, pos = read_varint(body, pos)
+                        values.append(value)
+                    records.append((round_num, kind, list(zip(values[::2], values[1::2]))))
+                    continue
+                values = []
+                for _ in names:
+                    value, pos = read_varint(body, pos)
+                    values.append(value)
+                records.append((round_num, kind, values))
+        except IndexError:
+            raise ReplayError("Recording is truncated") from None
+        return records
+
+    def human_votes(self):
+        """{round: (target name or None, timed_out)} for the recorded human's votes."""
+        names = self.player_names()
+        return {round_num: (names[values[1] - 1] if values[1] else None, bool(values[2]))
+                for round_num, kind, values in self.records if kind == EVENT_HUMAN_VOTE}
+
+    def player_names(self):
+        # names are drawn from the seed before anything else, so a fresh game recovers them
+        return [p.name for p in Game(self.header["players"], self.header["impostors"], headless=True,
+                                     seed=self.header["seed"], ship_map=self.ship_map).players]
+
+    def decisions(self, round_num=None):
+        """Decoded records ({"round", "kind", ...fields}) for one round, or all of them."""
+        names, rooms = self.player_names(), self.ship_map.rooms
+        role_names = list(ROLE_CODES)
+        decoded = []
+        for record_round, kind, values in self.records:
+            if round_num is not None and record_round != round_num:
+                continue
+            entry = {"round": record_round, "kind": kind}
+            if kind == "roles":
+                entry["roles"] = {names[i]: role_names[code] for i, code in enumerate(values)}
+            elif kind == EVENT_VOTE:
+                entry["votes"] = {names[voter]: names[target] for voter, target in values}
+            else:
+                for field, value in zip(REPLAY_FIELDS[kind], values):
+                    entry[field] = self._resolve(field, value, names, rooms)
+            decoded.append(entry)
+        return decoded
+
+    @staticmethod
+    def _resolve(field, value, names, rooms):
+        if field.startswith("maybe_"):
+            return names[value - 1] if value else None
+        if field in ("victim", "reporter", "seer", "seen", "investigator", "target", "player"):
+            return names[value]
+        if field in ("room", "location"):
+            return rooms[value]
+        if field == "role":
+            return list(ROLE_CODES)[value]
+        if field == "when":
+            return SIGHTING_TIMES[value]
+        if field == "sabotage":
+            return SABOTAGES[value]
+        if field == "reason":
+            return EJECTION_REASONS[value]
+        return bool(value)
+
+    def seek(self, round_num, renderer=None):
+        """A ReplayGame fast-forwarded, unrendered, to just before round `round_num`."""
+        game = ReplayGame(self)
+        game._assign_roles()
+        while not game.game_over and game.round_num < round_num - 1:
+            game._advance_round()
+        if renderer is not None:
+            game.renderer = renderer
+        return game
+
+    def resume(self, round_num, renderer=None):
+        """A live Game in the recorded state just before round `round_num`."""
+        game = self.seek(round_num).fork(renderer=renderer)
+        game.seed = self.header["seed"] # what it was created from, so it can still be recorded
+        return game
+
+    def play(self, renderer=None, from_round=1, until_round=None):
+        """Replay through `until_round` (default: the end), rendering from `from_round` on."""
+        if from_round <= 1:
+            game = ReplayGame(self, renderer)
+            game._show_welcome()
+            game._assign_roles()
+        else:
+            game = self.seek(from_round, renderer)
+        while not game.game_over and (until_round is None or game.round_num < until_round):
+            game._advance_round()
+        if game.game_over:
+            game._show_final_revelation()
+            if len(game.verifier.body) != len(self.body):
+                raise ReplayError("Game ended before the recording did")
+        game.renderer.flush()
+        return game
+
+    def verify(self):
+        """Replay headlessly at full speed; returns the GameResult or raises ReplayError."""
+        return self.play().result()
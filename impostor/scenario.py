@@ -0,0 +1,181 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .engine import Game, GameConfig, ShipMap, normalize_lobby
+from .replay import read_varint, write_varint
+
+# --- Scenarios ---
+# A scenario file is JSON: {"name", "rooms": {room: [tasks]}, "corridors": [[a, b], ...],
+# "players", "impostors", "config": {field: value}}, with "generate": {"rooms", "seed"}
+# in place of rooms/corridors for a ShipMap.generate() map. It is validated once and
+# compiled to <cache dir>/<content hash>.impmap: SCENARIO_MAGIC, a version byte, a
+# varint-length JSON header (names, lobby, config, section table), then 8-byte aligned
+# int32 arrays: per-room task offsets and task ids, neighbour offsets and neighbours, the
+# corridor list, and the next-hop table when NumPy was there to build it. Later loads map
+# that file.
+SCENARIO_MAGIC = b"IMPM"
+SCENARIO_VERSION = 1
+SCENARIO_KEYS = {"name", "rooms", "corridors", "generate", "players", "impostors", "impostor_ratio", "config"}
+SCENARIO_NEXT_HOP_ROOMS = 4096 # larger maps skip the (rooms x rooms) next-hop table
+
+
+class ScenarioError(ValueError):
+    """A scenario definition or compiled scenario file is invalid."""
+
+
+class Scenario:
+    """A ship map plus the lobby and balance settings to play on it."""
+    def __init__(self, ship_map, num_players=7, num_impostors=1, config=None, name="scenario", impostor_ratio=None):
+        self.ship_map = ship_map
+        self.num_players, self.num_impostors = normalize_lobby(num_players, num_impostors, impostor_ratio)
+        self.config = config if config is not None else GameConfig()
+        self.name = name
+        self.compiled_path = None # set when loaded through the cache
+
+    @classmethod
+    def from_definition(cls, definition):
+        """Validate a parsed scenario definition; raises ScenarioError."""
+        if not isinstance(definition, dict):
+            raise ScenarioError("A scenario must be a JSON object")
+        unknown = set(definition) - SCENARIO_KEYS
+        if unknown:
+            raise ScenarioError(f"Unknown scenario key(s): {', '.join(sorted(unknown))}")
+        try:
+            if "generate" in definition:
+                if "rooms" in definition or "corridors" in definition:
+                    raise ScenarioError("Give either 'generate' or 'rooms'/'corridors', not both")
+                ship_map = ShipMap.generate(int(definition["generate"]["rooms"]), definition["generate"].get("seed", 0))
+            elif "rooms" in definition:
+                rooms = definition["rooms"]
+                if not rooms or not all(isinstance(tasks, list) and all(isinstance(t, str) for t in tasks)
+                                        for tasks in rooms.values()):
+                    raise ScenarioError("'rooms' must map each room name to a list of task names")
+                ship_map = ShipMap({room: list(tasks) for room, tasks in rooms.items()},
+                                   [tuple(corridor) for corridor in definition.get("corridors", [])])
+            else:
+                ship_map = ShipMap()
+            return cls(ship_map, int(definition.get("players", 7)), int(definition.get("impostors", 1)),
+                       GameConfig(**definition.get("config", {})), str(definition.get("name", "scenario")),
+                       definition.get("impostor_ratio"))
+        except ScenarioError:
+            raise
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            raise ScenarioError(f"Invalid scenario: {e}") from None
+
+    def to_definition(self):
+        return {"name": self.name, "rooms": self.ship_map.location_tasks,
+                "corridors": [list(corridor) for corridor in self.ship_map.corridors],
+                "players": self.num_players, "impostors": self.num_impostors, "config": self.config.changes()}
+
+    def new_game(self, **kwargs):
+        """A Game on this scenario's map, lobby and config; kwargs go to Game()."""
+        kwargs.setdefault("config", self.config)
+        return Game(self.num_players, self.num_impostors, ship_map=self.ship_map, **kwargs)
+
+    def compile(self):
+        """This scenario in the compiled binary form."""
+        ship_map = self.ship_map
+        rooms = ship_map.rooms
+        task_names = list(dict.fromkeys(task for tasks in ship_map.location_tasks.values() for task in tasks))
+        task_ids = {task: i for i, task in enumerate(task_names)}
+        task_offsets, room_tasks, adj_offsets, adjacency = [0], [], [0], []
+        for room in rooms:
+            room_tasks += [task_ids[task] for task in ship_map.location_tasks[room]]
+            task_offsets.append(len(room_tasks))
+            adjacency += [ship_map.room_index[other] for other in ship_map.neighbours[room]]
+            adj_offsets.append(len(adjacency))
+        corridors = [ship_map.room_index[room] for corridor in ship_map.corridors for room in corridor]
+        sections = {"task_offsets": task_offsets, "task_ids": room_tasks, "adj_offsets": adj_offsets, "adjacency": adjacency,
+                    "corridors": corridors}
+        if np is not None and len(rooms) <= SCENARIO_NEXT_HOP_ROOMS:
+            sections["next_hop"] = ship_map.next_hop_table().astype(np.int32).ravel()
+        blobs, table, offset = [], {}, 0
+        for name, values in sections.items():
+            blob = values.astype("<i4").tobytes() if np is not None and isinstance(values, np.ndarray) else _int32_bytes(values)
+            table[name] = [offset, len(blob) // 4]
+            blobs.append(blob + b"\0" * (-len(blob) % 8))
+            offset += len(blobs[-1])
+        header = json.dumps({"name": self.name, "players": self.num_players, "impostors": self.num_impostors,
+                             "config": self.config.changes(), "rooms": rooms, "tasks": task_names,
+                             "sections": table}, separators=(",", ":")).encode()
+        out = bytearray(SCENARIO_MAGIC)
+        out.append(SCENARIO_VERSION)
+        write_varint(out, len(header))
+        out += header
+        out += b"\0" * (-len(out) % 8) # sections start 8-byte aligned
+        return bytes(out) + b"".join(blobs)
+
+    @classmethod
+    def from_compiled(cls, data):
+        """Rebuild a Scenario from compiled bytes (or a mmap) without revalidating it."""
+        if data[:len(SCENARIO_MAGIC)] != SCENARIO_MAGIC:
+            raise ScenarioError("Not a compiled scenario")
+        if data[len(SCENARIO_MAGIC)] != SCENARIO_VERSION:
+            raise ScenarioError(f"Unsupported compiled scenario version {data[len(SCENARIO_MAGIC)]}")
+        length, pos = read_varint(data, len(SCENARIO_MAGIC) + 1)
+        header = json.loads(bytes(data[pos:pos + length]))
+        base = pos + length + (-(pos + length) % 8)
+        view = memoryview(data)
+        sections = {name: view[base + offset:base + offset + 4 * count].cast("i")
+                    for name, (offset, count) in header["sections"].items()}
+        rooms, tasks = header["rooms"], header["tasks"]
+        task_offsets, task_ids = sections["task_offsets"], sections["task_ids"]
+        adj_offsets, adjacency = sections["adj_offsets"], sections["adjacency"]
+        location_tasks = {room: [tasks[t] for t in task_ids[task_offsets[i]:task_offsets[i + 1]]]
+                          for i, room in enumerate(rooms)}
+        neighbours = {room: tuple(rooms[j] for j in adjacency[adj_offsets[i]:adj_offsets[i + 1]])
+                      for i, room in enumerate(rooms)}
+        next_hop = None
+        if "next_hop" in header["sections"] and np is not None:
+            next_hop = np.frombuffer(sections["next_hop"], dtype="<i4").reshape(len(rooms), len(rooms))
+        pairs = sections["corridors"]
+        corridors = [(rooms[pairs[i]], rooms[pairs[i + 1]]) for i in range(0, len(pairs), 2)]
+        ship_map = ShipMap.from_compiled(location_tasks, neighbours, corridors, next_hop)
+        return cls(ship_map, header["players"], header["impostors"], GameConfig(**header["config"]), header["name"])
+
+
+def _int32_bytes(values):
+    """Little-endian int32 bytes of a list of ints."""
+    packed = array.array("i", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def scenario_cache_path(path, cache_dir=None):
+    """Where the compiled form of the scenario file at `path` lives (keyed by its content)."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read() + bytes([SCENARIO_VERSION])).hexdigest()[:16]
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), ".impostor-cache")
+    return os.path.join(cache_dir, f"{digest}.impmap")
+
+
+def load_scenario(path, cache_dir=None):
+    """Load a scenario file, compiling it into the cache on first use and mapping it after."""
+    compiled_path = scenario_cache_path(path, cache_dir)
+    if not os.path.exists(compiled_path):
+        with open(path) as f:
+            try:
+                definition = json.load(f)
+            except ValueError as e:
+                raise ScenarioError(f"{path}: not valid JSON ({e})") from None
+        data = Scenario.from_definition(definition).compile()
+        os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+        tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, compiled_path)
+    with open(compiled_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    scenario = Scenario.from_compiled(mapped)
+    scenario.compiled_path = compiled_path
+    return scenario
@@ -0,0 +1,500 @@
+import asyncio
+import json
+import os
+import random
+import time
+
+from .engine import (
+    EVENT_HUMAN_VOTE, BufferedRenderer, Game, GameMetrics, TaskEngine, VirtualClock, derive_seed
+)
+from .replay import GameRecorder, ReplayError
+from .spectators import SpectatorChannel, SpectatorView
+from .wal import WriteAheadLog
+
+# --- Network Lobby Server ---
+# Newline-delimited JSON over TCP. A client opens a lobby with
+#   {"type": "start", "players": 7, "impostors": 1, "seed": 123}
+# and plays players[0]; add "tasks": true (or a work chance for the TaskEngine) to play
+# to a task bar as well. The server answers with "welcome", streams "text" blocks,
+# sends "vote_request" when the human must vote and acknowledges each "vote" with
+# "vote_ack". The game ends with "result". {"type": "stats"} returns server counters and
+# {"type": "metrics"} the shared GameMetrics snapshot. Any number of spectators can send
+#   {"type": "watch", "lobby": 1}
+# to be answered with "watching" (the lobby's player names and rooms), after which the
+# connection carries SpectatorChannel frames until the game ends. A server with a
+# write-ahead log restores unfinished lobbies on start; their players reattach with
+#   {"type": "resume", "lobby": 1}
+# and play on from the first round that had not been committed.
+class Lobby:
+    """One running Game driven as a coroutine for a single connected player."""
+    def __init__(self, lobby_id, game, reader, writer, server, journal=None):
+        self.lobby_id = lobby_id
+        self.game = game
+        self.reader = reader
+        self.writer = writer
+        self.server = server
+        self.inbox = asyncio.Queue()
+        self.clock_mark = game.renderer.clock.now()
+        self.resumed = journal is not None
+        wal = server.wal
+        self.recorder = None
+        if server.record_dir or wal is not None:
+            self.recorder = GameRecorder(game, body=journal.body if journal is not None else None,
+                                         on_record=None if wal is None else lambda record: wal.record(lobby_id, record))
+            if wal is not None and journal is None:
+                wal.open_lobby(lobby_id, self.recorder.header())
+        self.channel = SpectatorChannel(game)
+
+    async def send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode())
+        self.server.messages_sent += 1
+        await self.writer.drain()
+
+    async def flush(self):
+        """Send the spectator frames and text rendered since the last flush, then wait out its pacing."""
+        self.channel.flush()
+        renderer = self.game.renderer
+        text = renderer.drain()
+        if text:
+            await self.send({"type": "text", "text": text})
+        owed = renderer.clock.now() - self.clock_mark
+        self.clock_mark = renderer.clock.now()
+        if owed > 0 and self.server.pace > 0:
+            await asyncio.sleep(owed * self.server.pace)
+
+    async def request_vote(self, human, alive_for_voting):
+        """Await the human's vote; on timeout fall back to the AI vote logic."""
+        names = sorted(p.name for p in alive_for_voting)
+        await self.send({"type": "vote_request", "round": self.game.round_num, "candidates": names,
+                         "timeout": self.server.vote_timeout})
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.server.vote_timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(self.inbox.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if message is None:
+                raise ConnectionResetError("player disconnected")
+            target = self.game.get_player_by_name(str(message.get("target", "")))
+            accepted = target is not None and target in alive_for_voting
+            await self.send({"type": "vote_ack", "accepted": accepted, "target": target.name if accepted else None})
+            if accepted:
+                self.game.events.append(EVENT_HUMAN_VOTE, self.game.round_num, human, target, False)
+                return target.name
+        self.server.vote_timeouts += 1
+        vote = self.game._choose_ai_vote(human, alive_for_voting, self.game.rng.random())
+        self.game.events.append(EVENT_HUMAN_VOTE, self.game.round_num, human, self.game.get_player_by_name(vote or ""), True)
+        await self.send({"type": "vote_ack", "accepted": False, "target": vote, "timed_out": True})
+        return vote
+
+    async def play(self):
+        game = self.game
+        human = game.players[0]
+        wal = self.server.wal
+        welcome = {"type": "welcome", "lobby": self.lobby_id, "you": human.name, "players": [p.name for p in game.players]}
+        if self.resumed:
+            await self.send({**welcome, "resumed_after_round": game.round_num})
+            game.renderer.line(f"Resuming after round {game.round_num}. You are {human.name}. Your role: {human.role}.")
+        else:
+            await self.send(welcome)
+            game.renderer.separator("=", 60)
+            game.renderer.say("  WELCOME TO THE ADVANCED 'FIND THE IMPOSTOR' GAME!  ", 0.04)
+            game.renderer.separator("=", 60)
+            game._assign_roles()
+            game.renderer.line(f"You are {human.name}. Your role: {human.role}.")
+        await self.flush()
+        while not game.game_over:
+            game._announce_round()
+            if game._open_round():
+                self.channel.alibis()
+                game.renderer.separator("VOTE")
+                alive_for_voting = game._voters()
+                ai_votes = game._collect_ai_votes(alive_for_voting, human.name)
+                await self.flush()
+                if human in alive_for_voting:
+                    ai_votes[human.name] = await self.request_vote(human, alive_for_voting)
+                game._close_round(game._tally_votes(ai_votes, alive_for_voting))
+            game._check_stalemate()
+            await self.flush()
+            if wal is not None: # a restart resumes from here
+                wal.end_round(self.lobby_id, game.round_num)
+                await wal.commit()
+        result = game.result()
+        if wal is not None:
+            wal.close_lobby(self.lobby_id)
+        self.channel.end()
+        if self.server.record_dir:
+            self.recorder.save(os.path.join(self.server.record_dir, f"{self.server.run_id}-lobby-{self.lobby_id}.rec"))
+        await self.send({"type": "result", "winner": result.winner, "rounds": result.rounds,
+                         "stalemate": result.stalemate,
+                         "roles": {p.name: p.role for p in game.players}})
+
+
+class GameServer:
+    """Hosts many lobbies in one asyncio process, one coroutine per lobby."""
+    def __init__(self, host="127.0.0.1", port=8765, pace=1.0, vote_timeout=30.0, record_dir=None, metrics_port=None,
+                 wal_dir=None):
+        self.host = host
+        self.port = port
+        self.pace = pace # multiplier on the game's pacing delays; 0 disables them
+        self.vote_timeout = vote_timeout
+        self.record_dir = record_dir # save a replay of every finished lobby here
+        self.wal_dir = wal_dir # journal running lobbies here and restore them on start
+        self.wal = None
+        self.restore_failures = 0
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.metrics = GameMetrics() # shared by every lobby
+        self.metrics_port = metrics_port # HTTP endpoint for Prometheus scrapes, if set
+        self._metrics_server = None
+        self.lobbies = {}
+        self.next_lobby_id = 1
+        self.lobbies_completed = 0
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.vote_timeouts = 0
+        self.frames_encoded = 0 # spectator frames of finished lobbies; live ones are added in stats()
+        self.frames_delivered = 0
+        self.spectator_bytes = 0
+        self.spectator_send_seconds = 0.0
+        self.started = time.monotonic()
+        self._server = None
+
+    def stats(self):
+        channels = [lobby.channel for lobby in self.lobbies.values()]
+        return {"type": "stats", "active_lobbies": len(self.lobbies), "lobbies_completed": self.lobbies_completed,
+                "messages_sent": self.messages_sent, "messages_received": self.messages_received,
+                "vote_timeouts": self.vote_timeouts, "spectators": sum(len(c) for c in channels),
+                "frames_encoded": self.frames_encoded + sum(c.frames_encoded for c in channels),
+                "frames_delivered": self.frames_delivered + sum(c.frames_delivered for c in channels),
+                "spectator_bytes": self.spectator_bytes + sum(c.bytes_delivered for c in channels),
+                "spectator_send_seconds": self.spectator_send_seconds + sum(c.send_seconds for c in channels),
+                "awaiting_resume": sum(1 for lobby in self.lobbies.values() if lobby.writer is None),
+                "restore_failures": self.restore_failures,
+                **({"wal": self.wal.stats()} if self.wal is not None else {}),
+                "cpu_seconds": time.process_time(), "uptime": time.monotonic() - self.started}
+
+    async def start(self):
+        if self.wal_dir is not None:
+            self.restore()
+            await self.wal.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.metrics_port is not None:
+            self._metrics_server = await asyncio.start_server(self._handle_metrics_http, self.host, self.metrics_port)
+            self.metrics_port = self._metrics_server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        for server in (self._server, self._metrics_server):
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+        if self.wal is not None:
+            await self.wal.close()
+
+    def restore(self):
+        """Bring back every lobby a previous run left unfinished, to wait for its player to resume it."""
+        self.wal = WriteAheadLog(self.wal_dir)
+        for lobby_id, journal in self.wal.recover().items():
+            try:
+                game = journal.restore(BufferedRenderer(clock=VirtualClock()))
+            except (ReplayError, ValueError, KeyError):
+                self.restore_failures += 1
+                self.wal.close_lobby(lobby_id)
+                continue
+            game.attach_metrics(self.metrics)
+            self.lobbies[lobby_id] = Lobby(lobby_id, game, None, None, self, journal)
+        self.next_lobby_id = max(self.next_lobby_id, self.wal.next_lobby_id)
+
+    async def _handle_metrics_http(self, reader, writer):
+        """Minimal HTTP/1.0 responder: /metrics.json gives JSON, any other path Prometheus text."""
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip(): # skip headers
+                pass
+            parts = request.decode(errors="replace").split()
+            if len(parts) > 1 and parts[1].startswith("/metrics.json"):
+                body, content_type = json.dumps(self.metrics.snapshot()), "application/json"
+            else:
+                body, content_type = self.metrics.to_prometheus(), "text/plain; version=0.0.4"
+            payload = body.encode()
+            writer.write(f"HTTP/1.0 200 OK\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_connection(self, reader, writer):
+        lobby = None
+        lobby_task = None
+        channel = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.messages_received += 1
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                kind = message.get("type")
+                if kind == "stats":
+                    writer.write((json.dumps(self.stats()) + "\n").encode())
+                    await writer.drain()
+                elif kind == "metrics":
+                    writer.write((json.dumps({"type": "metrics", **self.metrics.snapshot()}) + "\n").encode())
+                    await writer.drain()
+                elif kind == "start" and lobby is None:
+                    tasks = message.get("tasks")
+                    if tasks is True:
+                        tasks = TaskEngine()
+                    elif tasks:
+                        tasks = TaskEngine(work_chance=min(1.0, max(0.0, float(tasks))))
+                    game = Game(int(message.get("players", 7)), int(message.get("impostors", 1)),
+                                seed=message.get("seed"), renderer=BufferedRenderer(clock=VirtualClock()),
+                                metrics=self.metrics, tasks=tasks or None)
+                    lobby = Lobby(self.next_lobby_id, game, reader, writer, self)
+                    self.next_lobby_id += 1
+                    self.lobbies[lobby.lobby_id] = lobby
+                    lobby_task = asyncio.ensure_future(lobby.play())
+                    lobby_task.add_done_callback(lambda task, lobby=lobby: self._lobby_done(lobby, task, writer))
+                elif kind == "resume" and lobby is None:
+                    restored = self.lobbies.get(message.get("lobby"))
+                    if restored is None or restored.writer is not None:
+                        writer.write((json.dumps({"type": "error", "error": "no lobby waiting to resume"}) + "\n").encode())
+                        await writer.drain()
+                        continue
+                    lobby = restored
+                    lobby.reader, lobby.writer = reader, writer
+                    lobby_task = asyncio.ensure_future(lobby.play())
+                    lobby_task.add_done_callback(lambda task, lobby=lobby: self._lobby_done(lobby, task, writer))
+                elif kind == "watch" and lobby is None and channel is None:
+                    watched = self.lobbies.get(message.get("lobby"))
+                    if watched is None:
+                        writer.write((json.dumps({"type": "error", "error": "no such lobby"}) + "\n").encode())
+                        await writer.drain()
+                        continue
+                    writer.write((json.dumps({"type": "watching", "lobby": watched.lobby_id,
+                                              **watched.channel.header()}) + "\n").encode())
+                    channel = watched.channel
+                    channel.add(writer)
+                elif lobby is not None:
+                    lobby.inbox.put_nowait(message)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if channel is not None:
+                channel.discard(writer)
+            if lobby is not None:
+                lobby.inbox.put_nowait(None)
+            if lobby_task is not None:
+                try:
+                    await lobby_task
+                except Exception:
+                    pass
+            writer.close()
+
+    def _lobby_done(self, lobby, task, writer):
+        self.lobbies.pop(lobby.lobby_id, None)
+        lobby.channel.close()
+        if self.wal is not None and not task.cancelled(): # a lobby cut off by shutdown stays open to be resumed
+            self.wal.close_lobby(lobby.lobby_id)
+        self.frames_encoded += lobby.channel.frames_encoded
+        self.frames_delivered += lobby.channel.frames_delivered
+        self.spectator_bytes += lobby.channel.bytes_delivered
+        self.spectator_send_seconds += lobby.channel.send_seconds
+        if not task.cancelled() and task.exception() is None:
+            self.lobbies_completed += 1
+        writer.close()
+
+
+async def _load_client(host, port, players, impostors, seed, think_time, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(seed)
+    writer.write((json.dumps({"type": "start", "players": players, "impostors": impostors, "seed": seed}) + "\n").encode())
+    await writer.drain()
+    sent_at = None
+    result = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        kind = message["type"]
+        if kind == "vote_request":
+            if think_time:
+                await asyncio.sleep(rng.random() * think_time)
+            sent_at = time.perf_counter()
+            writer.write((json.dumps({"type": "vote", "target": rng.choice(message["candidates"])}) + "\n").encode())
+            await writer.drain()
+        elif kind == "vote_ack" and sent_at is not None:
+            latencies.append(time.perf_counter() - sent_at)
+            sent_at = None
+        elif kind == "result":
+            result = message
+            break
+    writer.close()
+    return result
+
+
+async def _query_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"type": "stats"}\n')
+    await writer.drain()
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def run_load(host="127.0.0.1", port=8765, lobbies=200, players=7, impostors=1, think_time=0.0, seed=0):
+    """Play `lobbies` concurrent games against a running server and report latency and throughput."""
+    before = await _query_stats(host, port)
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        _load_client(host, port, players, impostors, derive_seed(seed, i), think_time, latencies)
+        for i in range(lobbies)])
+    elapsed = time.perf_counter() - start
+    after = await _query_stats(host, port)
+    latencies.sort()
+    completed = sum(1 for r in results if r is not None)
+    server_cpu = after["cpu_seconds"] - before["cpu_seconds"]
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {"lobbies": lobbies, "completed": completed, "elapsed": elapsed, "votes": len(latencies),
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+            "server_cpu_seconds": server_cpu,
+            "lobbies_per_cpu_second": completed / server_cpu if server_cpu > 0 else float("inf")}
+
+
+async def _read_frame(reader):
+    length = shift = 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return await reader.readexactly(length)
+        shift += 7
+
+
+async def watch_lobby(host, port, lobby_id, on_entry=None, on_joined=None):
+    """Spectate a lobby until it ends; returns (SpectatorView, frames, payload bytes)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps({"type": "watch", "lobby": lobby_id}) + "\n").encode())
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    if reply["type"] != "watching":
+        writer.close()
+        raise ConnectionError(reply.get("error", "watch refused"))
+    if on_joined is not None:
+        on_joined()
+    view = SpectatorView(reply)
+    frames = received = 0
+    try:
+        while view.result is None:
+            payload = await _read_frame(reader)
+            frames += 1
+            received += len(payload)
+            for entry in view.apply(payload):
+                if on_entry is not None:
+                    on_entry(entry)
+    except asyncio.IncompleteReadError:
+        pass
+    writer.close()
+    return view, frames, received
+
+
+async def _spectated_client(host, port, players, impostors, seed, viewers, late, viewing):
+    """Play one lobby like _load_client while `viewers` spectators watch it."""
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(seed)
+    writer.write((json.dumps({"type": "start", "players": players, "impostors": impostors, "seed": seed}) + "\n").encode())
+    await writer.drain()
+    lobby_id = json.loads(await reader.readline())["lobby"]
+    watchers = []
+
+    async def join(count):
+        joined = asyncio.Semaphore(0)
+
+        async def viewer():
+            try:
+                return await watch_lobby(host, port, lobby_id, on_joined=joined.release)
+            except ConnectionError:
+                joined.release()
+                return None
+
+        for _ in range(count):
+            watchers.append(asyncio.ensure_future(viewer()))
+        for _ in range(count):
+            await joined.acquire()
+
+    await join(viewers - late)
+    result = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] == "vote_request":
+            if late:
+                await join(late)
+                late = 0
+            writer.write((json.dumps({"type": "vote", "target": rng.choice(message["candidates"])}) + "\n").encode())
+            await writer.drain()
+        elif message["type"] == "result":
+            result = message
+            break
+    writer.close()
+    for watched in await asyncio.gather(*watchers):
+        if watched is None:
+            continue
+        view, frames, received = watched
+        viewing.append((view.result is not None and result is not None and view.result["winner"] == result["winner"]
+                        and view.result["roles"] == result["roles"], frames, received))
+    return result
+
+
+async def run_spectator_load(host="127.0.0.1", port=8765, lobbies=1, viewers=1000, late=0.5, players=7, impostors=1,
+                             seed=0):
+    """Play lobbies against a running server, unwatched and then watched, and report the difference."""
+    async def play(count):
+        before = await _query_stats(host, port)
+        viewing = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            _spectated_client(host, port, players, impostors, derive_seed(seed, i), count, int(count * late), viewing)
+            for i in range(lobbies)])
+        elapsed = time.perf_counter() - start
+        after = await _query_stats(host, port)
+        return results, viewing, elapsed, {key: after[key] - before[key] for key in
+                                           ("cpu_seconds", "frames_encoded", "frames_delivered", "spectator_bytes",
+                                            "spectator_send_seconds")}
+
+    _, _, _, baseline = await play(0)
+    results, viewing, elapsed, served = await play(viewers)
+    spectators = lobbies * viewers
+    extra_cpu = served["cpu_seconds"] - baseline["cpu_seconds"]
+    return {"lobbies": lobbies, "viewers_per_lobby": viewers, "late_joiners_per_lobby": int(viewers * late),
+            "completed": sum(1 for r in results if r is not None), "elapsed": elapsed,
+            "viewers_joined": len(viewing), "viewers_in_sync": sum(1 for ok, _, _ in viewing if ok),
+            "frames_per_viewer": sum(frames for _, frames, _ in viewing) / max(1, len(viewing)),
+            "bytes_per_viewer": sum(received for _, _, received in viewing) / max(1, len(viewing)),
+            "frames_encoded": served["frames_encoded"], "frames_delivered": served["frames_delivered"],
+            "server_cpu_seconds": served["cpu_seconds"], "unwatched_cpu_seconds": baseline["cpu_seconds"],
+            "cpu_us_per_viewer": extra_cpu / spectators * 1e6 if spectators else 0.0, # connection setup included
+            "send_us_per_frame_delivered": (served["spectator_send_seconds"] / served["frames_delivered"] * 1e6
+                                            if served["frames_delivered"] else 0.0)}
@@ -0,0 +1,352 @@
+import os
+import random
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .engine import (
+    CLUE_FOLLOW_CHANCE, ROLE_CODES, ROLE_CREWMATE, ROLE_DETECTIVE, ROLE_IMPOSTOR, ROLE_MEDIC, WINNER_CODES,
+    WINNER_CREW, WINNER_IMPOSTORS, Game, GameConfig, GameMetrics, MovementEngine, ShipMap, derive_seed,
+    normalize_lobby
+)
+from .scenario import load_scenario
+
+# --- Batch Simulation (NumPy) ---
+class BatchResult:
+    """Per-game outcome arrays for a batch of simulated matches."""
+    def __init__(self, num_players, num_impostors, winner, rounds, kills, ejections, impostor_ejections, sightings, stalemate, role, alive):
+        self.num_players = num_players
+        self.num_impostors = num_impostors
+        self.winner = winner # WINNER_CODES
+        self.rounds = rounds
+        self.kills = kills
+        self.ejections = ejections
+        self.impostor_ejections = impostor_ejections
+        self.sightings = sightings
+        self.stalemate = stalemate
+        self.role = role # (games, players) ROLE_CODES at the end of each game
+        self.alive = alive
+
+    def __len__(self):
+        return len(self.winner)
+
+    def crew_win_rate(self):
+        return float(np.mean(self.winner == WINNER_CODES[WINNER_CREW])) if len(self) else 0.0
+
+    def summary(self):
+        return {
+            "games": len(self),
+            "crew_win_rate": self.crew_win_rate(),
+            "mean_rounds": float(self.rounds.mean()) if len(self) else 0.0,
+            "mean_ejections": float(self.ejections.mean()) if len(self) else 0.0,
+            "mean_sightings": float(self.sightings.mean()) if len(self) else 0.0,
+        }
+
+
+class BatchSimulator:
+    """Plays num_games matches in lockstep, one round at a time, as NumPy arrays."""
+    def __init__(self, num_players=7, num_impostors=1, num_games=10000, seed=None, ship_map=None, config=None):
+        if np is None:
+            raise ImportError("BatchSimulator requires NumPy (pip install numpy)")
+        self.num_players, self.num_impostors = normalize_lobby(num_players, num_impostors)
+        self.num_games = num_games
+        self.config = config if config is not None else GameConfig()
+        self.ship_map = ship_map if ship_map is not None else ShipMap.default()
+        self.num_rooms = len(self.ship_map)
+        table, degree = self.ship_map.adjacency_table()
+        self.adjacency = np.array(table, dtype=np.int64)
+        self.degree = np.array(degree, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+
+    def _assign_roles(self):
+        order = np.argsort(self.rng.random((self.num_games, self.num_players)), axis=1)
+        role = np.empty((self.num_games, self.num_players), dtype=np.int8)
+        rank_role = np.full(self.num_players, ROLE_CODES[ROLE_CREWMATE], dtype=np.int8)
+        rank_role[:self.num_impostors] = ROLE_CODES[ROLE_IMPOSTOR]
+        if self.num_players > self.num_impostors:
+            rank_role[self.num_impostors] = ROLE_CODES[ROLE_MEDIC]
+        if self.num_players > self.num_impostors + 1:
+            rank_role[self.num_impostors + 1] = ROLE_CODES[ROLE_DETECTIVE]
+        np.put_along_axis(role, order, rank_role[None, :], axis=1)
+        return role
+
+    def _pick(self, mask):
+        """Uniform random column index per row (or per row pair) among True entries; -1 if none."""
+        keys = np.where(mask, self.rng.random(mask.shape), -1.0)
+        choice = keys.argmax(axis=-1)
+        return np.where(mask.any(axis=-1), choice, -1)
+
+    def _adjacent_room(self, room):
+        # Uniform neighbour from the ship map, like Game._get_adjacent_rooms; rooms without
+        # corridors stay put.
+        degree = self.degree[room]
+        pick = (self.rng.random(room.shape) * degree).astype(np.int64)
+        return np.where(degree > 0, self.adjacency[room, np.minimum(pick, self.adjacency.shape[1] - 1)], room)
+
+    def _play_round(self, alive, role, n):
+        """Advance n active games by one round; returns the per-game round record."""
+        rng = self.rng
+        config = self.config
+        P = self.num_players
+        rows = np.arange(n)
+        eye = np.eye(P, dtype=bool)[None, :, :]
+        is_imp = role == ROLE_CODES[ROLE_IMPOSTOR]
+
+        # _setup_round: one living impostor kills a random living crewmate
+        acting = self._pick(alive & is_imp)
+        victim = self._pick(alive & ~is_imp)
+        alive[rows, victim] = False
+        location = rng.integers(0, self.num_rooms, size=(n, P))
+        victim_room = location[rows, victim]
+        lie = rng.random(n) < config.impostor_lie_quality
+        acting_room, adjacent = location[rows, acting], self._adjacent_room(victim_room)
+        lie_options = np.stack([victim_room, acting_room, adjacent], axis=1)
+        distinct = np.stack([np.ones(n, dtype=bool), acting_room != victim_room,
+                             (adjacent != victim_room) & (adjacent != acting_room)], axis=1) # as the scalar dict.fromkeys
+        murder_room = np.where(lie, lie_options[rows, self._pick(distinct)], rng.integers(0, self.num_rooms, size=n))
+        location = rng.integers(0, self.num_rooms, size=(n, P)) # fresh alibis for everyone else
+        location[rows, acting] = murder_room
+
+        # _impostor_sabotage_attempt + _generate_sightings
+        sabotage = rng.random(n) < config.sabotage_chance
+        chance = np.where(sabotage, config.sighting_probability * (1 - config.sabotage_lights_out_sighting_reduction),
+                          config.sighting_probability)
+        seers = alive & (rng.random((n, P)) < chance[:, None])
+        roll = rng.random((n, P))
+        near_victim = (victim_room[:, None] == location) | (murder_room[:, None] == location)
+        crew_alive = (alive & ~is_imp).sum(axis=1)
+        # near[g, seer, imp]: a living impostor in the seer's room or the murder room
+        near = (alive & is_imp)[:, None, :] & ((location[:, None, :] == location[:, :, None]) |
+                                               (location[:, None, :] == murder_room[:, None, None]))
+        near_count = near.sum(axis=2)
+        saw_impostor = seers & (near_count > 0) & (roll < config.sighting_impostor_bias)
+        saw_victim = seers & ~saw_impostor & (roll < config.sighting_impostor_bias + config.sighting_victim_bias) & near_victim
+        others = crew_alive[:, None] - (~is_imp).astype(np.int64) # living crew other than the seer
+        far_impostors = (alive & is_imp).sum(axis=1)[:, None] - near_count
+        saw_other = seers & ~saw_impostor & ~saw_victim & ((others > 0) | (far_impostors > 0))
+        sightings = (saw_impostor | saw_victim | saw_other).sum(axis=1)
+
+        # _perform_special_roles_actions
+        others_alive = alive[:, None, :] & ~eye
+        scan_target = self._pick(others_alive)
+        scan_ok = scan_target >= 0
+        target_is_imp = is_imp[rows[:, None], np.maximum(scan_target, 0)]
+        correct = rng.random((n, P)) < config.detective_clue_accuracy
+        detective_suspicious = np.where(correct, target_is_imp, ~target_is_imp)
+
+        # _get_player_vote (AI rules for every voter)
+        uniform_other = self._pick(others_alive)
+        crew_other = self._pick(others_alive & ~is_imp[:, None, :])
+        living_imp = self._pick(others_alive & is_imp[:, None, :])
+        vote = uniform_other.copy()
+        fallthrough = (rng.random((n, P)) < config.crewmate_accusation_accuracy) & (living_imp >= 0)
+        vote = np.where(fallthrough, living_imp, vote)
+        # Medic scans are always right; Detective clues are right with detective_clue_accuracy
+        follow_clue = scan_ok & (
+            ((role == ROLE_CODES[ROLE_MEDIC]) & target_is_imp) |
+            ((role == ROLE_CODES[ROLE_DETECTIVE]) & detective_suspicious))
+        follow_clue &= rng.random((n, P)) < CLUE_FOLLOW_CHANCE
+        vote = np.where(follow_clue, scan_target, vote)
+        vote = np.where(is_imp, np.where(crew_other >= 0, crew_other, uniform_other), vote)
+
+        votes_for = ((vote[:, :, None] == np.arange(P)[None, None, :]) & alive[:, :, None]).sum(axis=1)
+        top = votes_for.max(axis=1)
+        unique_top = (votes_for == top[:, None]).sum(axis=1) == 1
+        ejected = np.where(unique_top, votes_for.argmax(axis=1), -1)
+        has_ejection = ejected >= 0
+        alive[rows[has_ejection], ejected[has_ejection]] = False
+        ejected_imp = has_ejection & is_imp[rows, np.maximum(ejected, 0)]
+        return sightings, has_ejection, ejected_imp
+
+    def run(self):
+        """Play every game to completion and return a BatchResult."""
+        K, P = self.num_games, self.num_players
+        role = self._assign_roles()
+        alive = np.ones((K, P), dtype=bool)
+        winner = np.full(K, -1, dtype=np.int8)
+        rounds = np.zeros(K, dtype=np.int32)
+        ejections = np.zeros(K, dtype=np.int32)
+        impostor_ejections = np.zeros(K, dtype=np.int32)
+        sightings = np.zeros(K, dtype=np.int64)
+        stalemate = np.zeros(K, dtype=bool)
+        stalemate_round = P * 2 + 2
+        crew_code, imp_code = WINNER_CODES[WINNER_CREW], WINNER_CODES[WINNER_IMPOSTORS]
+
+        active = np.arange(K)
+        while len(active):
+            sub_alive = alive[active]
+            sub_role = role[active]
+            seen, ejected, ejected_imp = self._play_round(sub_alive, sub_role, len(active))
+            alive[active] = sub_alive
+            rounds[active] += 1
+            sightings[active] += seen
+            ejections[active] += ejected
+            impostor_ejections[active] += ejected_imp
+
+            # _check_win_conditions, then the stalemate rule in start_game
+            is_imp = sub_role == ROLE_CODES[ROLE_IMPOSTOR]
+            imps_alive = (sub_alive & is_imp).sum(axis=1)
+            crew_alive = (sub_alive & ~is_imp).sum(axis=1)
+            crew_win = imps_alive == 0
+            imp_win = ~crew_win & (imps_alive >= crew_alive)
+            timed_out = ~crew_win & ~imp_win & (rounds[active] > stalemate_round)
+            winner[active[crew_win]] = crew_code
+            winner[active[imp_win | timed_out]] = imp_code
+            stalemate[active[timed_out]] = True
+            active = active[~(crew_win | imp_win | timed_out)]
+
+        return BatchResult(P, self.num_impostors, winner, rounds, rounds.copy(), ejections, impostor_ejections, sightings, stalemate, role, alive)
+
+
+# --- Parallel Simulation Runner ---
+class SimulationStats:
+    """Mergeable aggregate of many games: win counts, round histogram and per-role survival."""
+    def __init__(self):
+        self.games = 0
+        self.wins = {WINNER_CREW: 0, WINNER_IMPOSTORS: 0}
+        self.stalemates = 0
+        self.round_histogram = {} # rounds -> games
+        self.role_counts = {role: 0 for role in ROLE_CODES}
+        self.role_survivors = {role: 0 for role in ROLE_CODES}
+        self.metrics = None # GameMetrics, when the run collects them
+
+    def add_game(self, winner, rounds, stalemate, roles_and_alive):
+        self.games += 1
+        self.wins[winner] += 1
+        self.stalemates += bool(stalemate)
+        self.round_histogram[rounds] = self.round_histogram.get(rounds, 0) + 1
+        for role, is_alive in roles_and_alive:
+            self.role_counts[role] += 1
+            self.role_survivors[role] += bool(is_alive)
+
+    def add_batch(self, batch):
+        self.games += len(batch)
+        for winner, code in WINNER_CODES.items():
+            self.wins[winner] += int((batch.winner == code).sum())
+        self.stalemates += int(batch.stalemate.sum())
+        rounds, counts = np.unique(batch.rounds, return_counts=True)
+        for r, c in zip(rounds.tolist(), counts.tolist()):
+            self.round_histogram[r] = self.round_histogram.get(r, 0) + c
+        for role, code in ROLE_CODES.items():
+            of_role = batch.role == code
+            self.role_counts[role] += int(of_role.sum())
+            self.role_survivors[role] += int((of_role & batch.alive).sum())
+
+    def merge(self, other):
+        self.games += other.games
+        self.stalemates += other.stalemates
+        for winner, count in other.wins.items():
+            self.wins[winner] += count
+        for rounds, count in other.round_histogram.items():
+            self.round_histogram[rounds] = self.round_histogram.get(rounds, 0) + count
+        for role in ROLE_CODES:
+            self.role_counts[role] += other.role_counts[role]
+            self.role_survivors[role] += other.role_survivors[role]
+        if other.metrics is not None:
+            self.metrics = (self.metrics or GameMetrics()).merge(other.metrics)
+        return self
+
+    def survival_rates(self):
+        return {role: (self.role_survivors[role] / self.role_counts[role]) if self.role_counts[role] else 0.0
+                for role in ROLE_CODES}
+
+    def to_dict(self):
+        return {
+            "games": self.games,
+            "wins": dict(self.wins),
+            "crew_win_rate": self.wins[WINNER_CREW] / self.games if self.games else 0.0,
+            "stalemates": self.stalemates,
+            "round_histogram": dict(sorted(self.round_histogram.items())),
+            "survival_rates": self.survival_rates(),
+        }
+
+
+def _run_simulation_batch(task):
+    """Worker entry point: play one seeded batch and return only its aggregate."""
+    engine, num_players, num_impostors, num_games, seed, num_rooms, with_metrics, config, movement_ticks, scenario, task_engine = task
+    if scenario:
+        ship_map = load_scenario(scenario).ship_map # mapped from the compiled cache, shared across workers
+    else:
+        ship_map = ShipMap.generate(num_rooms) if num_rooms else ShipMap()
+    movement = MovementEngine(movement_ticks) if movement_ticks else None
+    stats = SimulationStats()
+    stats.metrics = GameMetrics() if with_metrics else None
+    if engine == "batch":
+        stats.add_batch(BatchSimulator(num_players, num_impostors, num_games, seed=seed, ship_map=ship_map, config=config).run())
+        return stats
+    seeds = random.Random(seed)
+    for _ in range(num_games):
+        game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64), ship_map=ship_map,
+                    metrics=stats.metrics, config=config, movement=movement, tasks=task_engine)
+        result = game.simulate()
+        stats.add_game(result.winner, result.rounds, result.stalemate,
+                       [(p.role, p.is_alive) for p in game.players])
+    return stats
+
+
+def run_simulations(num_games, num_players=7, num_impostors=1, master_seed=0, workers=None,
+                    engine="scalar", batch_size=None, num_rooms=None, metrics=False, config=None, movement_ticks=None,
+                    scenario=None, task_engine=None):
+    """Play num_games headless games over a process pool and return merged SimulationStats."""
+    if engine not in ("scalar", "batch"):
+        raise ValueError(f"Unknown engine: {engine}")
+    if metrics and engine != "scalar":
+        raise ValueError("Per-phase metrics are only collected by the scalar engine")
+    if movement_ticks and engine != "scalar":
+        raise ValueError("Movement is only simulated by the scalar engine")
+    if task_engine is not None and engine != "scalar":
+        raise ValueError("Tasks are only simulated by the scalar engine")
+    if batch_size is None:
+        batch_size = 50000 if engine == "batch" else 500
+    tasks = []
+    for index, start in enumerate(range(0, num_games, batch_size)):
+        tasks.append((engine, num_players, num_impostors, min(batch_size, num_games - start), derive_seed(master_seed, index), num_rooms, metrics, config,
+                      movement_ticks, scenario, task_engine))
+
+    stats = SimulationStats()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            stats.merge(_run_simulation_batch(task))
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch_stats in pool.map(_run_simulation_batch, tasks):
+            stats.merge(batch_stats)
+    return stats
+
+
+PLAYER_DICT_BYTES = 820 # a Player with a __dict__ and task dicts, as measured before slotting
+PLAYER_BYTES_TARGET = PLAYER_DICT_BYTES / 10
+
+def measure_memory(num_games=2000, num_players=10, num_impostors=2, seed=0):
+    """Bytes held per finished headless game (players, event log and all) while kept in memory."""
+    seeds = random.Random(seed)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = []
+        for _ in range(num_games):
+            game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64))
+            game.simulate()
+            games.append(game)
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    players = [p for game in games for p in game.players]
+    player_bytes = sum(sys.getsizeof(p) + sys.getsizeof(p.task_codes) for p in players)
+    bytes_per_player = player_bytes / len(players) if players else 0.0
+    return {
+        "games": num_games,
+        "players_per_game": games[0].num_players if games else num_players,
+        "bytes_per_game": held / num_games if num_games else 0.0,
+        "bytes_per_player": bytes_per_player,
+        "bytes_per_player_before": PLAYER_DICT_BYTES,
+        "bytes_per_player_target": PLAYER_BYTES_TARGET,
+        "player_target_met": bytes_per_player <= PLAYER_BYTES_TARGET,
+        "events_per_game": sum(len(game.events) for game in games) / num_games if num_games else 0.0,
+    }
@@ -0,0 +1,232 @@
+import math
+
+from .engine import (
+    CLUE_FOLLOW_CHANCE, ROLE_CREWMATE, ROLE_DETECTIVE, ROLE_IMPOSTOR, ROLE_MEDIC, WINNER_CREW,
+    WINNER_IMPOSTORS, GameConfig, normalize_lobby
+)
+from .simulation import run_simulations
+
+# --- Exact Solver ---
+# Votes only depend on who is alive and on this round's investigator clues, so a game is a
+# Markov chain over (plain crew, medic alive, detective alive, impostors) plus the round
+# counter for the stalemate limit. Sightings, sabotage and alibis are flavour: they use the
+# rng but never reach a vote. The solver mirrors _setup_round (uniform kill among the crew),
+# _perform_special_roles_actions (clues), _choose_ai_vote/_tally_votes (ejection) and
+# _check_win_conditions/_check_stalemate, for an all-AI game as played by Game.simulate.
+
+# Vote classes: alive players who are interchangeable for the tally share a class
+VOTE_IMPOSTOR, VOTE_IMPOSTOR_M, VOTE_IMPOSTOR_D, VOTE_IMPOSTOR_MD = 0, 1, 2, 3 # _M/_D: flagged by the medic/detective
+VOTE_CREWMATE, VOTE_CREWMATE_D, VOTE_MEDIC, VOTE_DETECTIVE = 4, 5, 6, 7
+VOTE_IMPOSTOR_CLASSES = (VOTE_IMPOSTOR, VOTE_IMPOSTOR_M, VOTE_IMPOSTOR_D, VOTE_IMPOSTOR_MD)
+VOTE_CLASS_ROLES = {VOTE_IMPOSTOR: ROLE_IMPOSTOR, VOTE_IMPOSTOR_M: ROLE_IMPOSTOR, VOTE_IMPOSTOR_D: ROLE_IMPOSTOR,
+                    VOTE_IMPOSTOR_MD: ROLE_IMPOSTOR, VOTE_CREWMATE: ROLE_CREWMATE, VOTE_CREWMATE_D: ROLE_CREWMATE,
+                    VOTE_MEDIC: ROLE_MEDIC, VOTE_DETECTIVE: ROLE_DETECTIVE}
+
+
+class ExactSolver:
+    """Exact outcome distribution of headless games, by memoized recursion over game states."""
+    def __init__(self, config=None):
+        self.config = config if config is not None else GameConfig()
+        self._votes = {} # (crew, medic, detective, impostors) after the kill -> {ejected role or None: p}
+        self._rounds = {} # (state, round) -> {(winner, rounds, stalemate): p}
+
+    def solve(self, num_players, num_impostors):
+        num_players, num_impostors = normalize_lobby(num_players, num_impostors)
+        crew = num_players - num_impostors # _assign_roles: a medic, then a detective, from the crew
+        medic, detective = int(crew >= 1), int(crew >= 2)
+        self._stalemate_round = num_players * 2 + 2
+        self._rounds = {}
+        outcomes = self._play((crew - medic - detective, medic, detective, num_impostors), 1)
+        wins = {WINNER_CREW: 0.0, WINNER_IMPOSTORS: 0.0}
+        round_distribution = {}
+        stalemate = expected_rounds = 0.0
+        for (winner, rounds, is_stalemate), p in outcomes.items():
+            wins[winner] += p
+            stalemate += p * is_stalemate
+            expected_rounds += p * rounds
+            round_distribution[rounds] = round_distribution.get(rounds, 0.0) + p
+        return {"players": num_players, "impostors": num_impostors, "crew_win_rate": wins[WINNER_CREW],
+                "impostor_win_rate": wins[WINNER_IMPOSTORS], "stalemate_rate": stalemate,
+                "expected_rounds": expected_rounds, "round_distribution": dict(sorted(round_distribution.items()))}
+
+    def _play(self, state, round_num):
+        """Outcomes of the game from the start of round `round_num` in `state`."""
+        key = (state, round_num)
+        if key in self._rounds:
+            return self._rounds[key]
+        plain, medic, detective, impostors = state
+        crew = plain + medic + detective
+        outcomes = {}
+        # _setup_round: the victim is uniform over the living crew
+        for victim_prob, after_kill in ((plain / crew, (plain - 1, medic, detective)),
+                                        (medic / crew, (plain, 0, detective)),
+                                        (detective / crew, (plain, medic, 0))):
+            if not victim_prob:
+                continue
+            for ejected, vote_prob in self._vote(*after_kill, impostors).items():
+                p = victim_prob * vote_prob
+                c, m, d = after_kill
+                i = impostors
+                if ejected == ROLE_IMPOSTOR: i -= 1
+                elif ejected == ROLE_CREWMATE: c -= 1
+                elif ejected == ROLE_MEDIC: m = 0
+                elif ejected == ROLE_DETECTIVE: d = 0
+                if not i: # _check_win_conditions, then _check_stalemate
+                    ends = {(WINNER_CREW, round_num, False): 1.0}
+                elif i >= c + m + d:
+                    ends = {(WINNER_IMPOSTORS, round_num, False): 1.0}
+                elif round_num > self._stalemate_round:
+                    ends = {(WINNER_IMPOSTORS, round_num, True): 1.0}
+                else:
+                    ends = self._play((c, m, d, i), round_num + 1)
+                for outcome, q in ends.items():
+                    outcomes[outcome] = outcomes.get(outcome, 0.0) + p * q
+        self._rounds[key] = outcomes
+        return outcomes
+
+    def _clue_setups(self, plain, medic, detective, impostors):
+        """[(p, vote classes of the living, medic's suspicious class, detective's)] for this round's clues."""
+        others = plain + medic + detective + impostors - 1 # an investigator never picks themselves
+        accuracy = self.config.detective_clue_accuracy
+        medic_picks = [(1.0, None)]
+        if medic: # MEDIC_SCAN_ACCURACY: the scan is suspicious exactly when it hits an impostor
+            medic_picks = [(impostors / others, VOTE_IMPOSTOR), (1 - impostors / others, None)]
+        detective_picks = [(1.0, None)]
+        if detective:
+            detective_picks = [(impostors / others * accuracy, VOTE_IMPOSTOR),
+                               (medic / others * (1 - accuracy), VOTE_MEDIC),
+                               (plain / others * (1 - accuracy), VOTE_CREWMATE)]
+            detective_picks.append((1.0 - sum(p for p, _ in detective_picks), None))
+        setups = []
+        for medic_prob, medic_target in medic_picks:
+            for detective_prob, detective_target in detective_picks:
+                p = medic_prob * detective_prob
+                if not p:
+                    continue
+                if medic_target is not None and detective_target == VOTE_IMPOSTOR: # same impostor or not
+                    same = 1 / impostors
+                    setups.append((p * same, [VOTE_IMPOSTOR_MD], VOTE_IMPOSTOR_MD, VOTE_IMPOSTOR_MD))
+                    if impostors > 1:
+                        setups.append((p * (1 - same), [VOTE_IMPOSTOR_M, VOTE_IMPOSTOR_D], VOTE_IMPOSTOR_M, VOTE_IMPOSTOR_D))
+                    continue
+                flagged, medic_class, detective_class = [], None, None
+                if medic_target is not None:
+                    flagged.append(VOTE_IMPOSTOR_M)
+                    medic_class = VOTE_IMPOSTOR_M
+                if detective_target == VOTE_IMPOSTOR:
+                    flagged.append(VOTE_IMPOSTOR_D)
+                    detective_class = VOTE_IMPOSTOR_D
+                elif detective_target == VOTE_CREWMATE:
+                    detective_class = VOTE_CREWMATE_D
+                elif detective_target == VOTE_MEDIC:
+                    detective_class = VOTE_MEDIC
+                setups.append((p, flagged, medic_class, detective_class))
+        result = []
+        for p, flagged_impostors, medic_class, detective_class in setups:
+            classes = flagged_impostors + [VOTE_IMPOSTOR] * (impostors - len(flagged_impostors))
+            classes += [VOTE_CREWMATE] * plain
+            if detective_class == VOTE_CREWMATE_D:
+                classes[-1] = VOTE_CREWMATE_D
+            classes += [VOTE_MEDIC] * medic + [VOTE_DETECTIVE] * detective
+            result.append((p, classes, medic_class, detective_class))
+        return result
+
+    def _vote_weights(self, classes, medic_class, detective_class):
+        """weights[voter class][target class]: chance a voter picks one given living player of that class."""
+        impostors = sum(cls in VOTE_IMPOSTOR_CLASSES for cls in classes)
+        crew = len(classes) - impostors
+        accuracy = self.config.crewmate_accusation_accuracy
+        fallthrough = {target: accuracy * (target in VOTE_IMPOSTOR_CLASSES) / impostors + (1 - accuracy) / (len(classes) - 1)
+                       for target in VOTE_CLASS_ROLES}
+        weights = {}
+        for voter in VOTE_CLASS_ROLES:
+            if voter in VOTE_IMPOSTOR_CLASSES:
+                weights[voter] = {target: (target not in VOTE_IMPOSTOR_CLASSES) / crew for target in VOTE_CLASS_ROLES}
+                continue
+            clue = medic_class if voter == VOTE_MEDIC else detective_class if voter == VOTE_DETECTIVE else None
+            if clue is None:
+                weights[voter] = fallthrough
+            else:
+                weights[voter] = {target: CLUE_FOLLOW_CHANCE * (target == clue) + (1 - CLUE_FOLLOW_CHANCE) * p
+                                  for target, p in fallthrough.items()}
+        return weights
+
+    def _vote(self, plain, medic, detective, impostors):
+        """{ejected role, or None for a tie: p} for one meeting of these living players."""
+        key = (plain, medic, detective, impostors)
+        if key in self._votes:
+            return self._votes[key]
+        ejections = {}
+        for setup_prob, classes, medic_class, detective_class in self._clue_setups(plain, medic, detective, impostors):
+            weights = self._vote_weights(classes, medic_class, detective_class)
+            for ejected, p in self._tally(classes, weights).items():
+                ejections[ejected] = ejections.get(ejected, 0.0) + setup_prob * p
+        self._votes[key] = ejections
+        return ejections
+
+    @staticmethod
+    def _tally(classes, weights):
+        """Distribution of the vote's unique leader, summed over every voter -> target assignment."""
+        order = sorted(classes, key=lambda cls: (cls != VOTE_CREWMATE_D, cls != VOTE_CREWMATE, cls))
+        plain_total = sum(cls in (VOTE_CREWMATE, VOTE_CREWMATE_D) for cls in classes)
+        impostor_weights, plain_weights = weights[VOTE_IMPOSTOR], weights[VOTE_CREWMATE]
+        medic_weights, detective_weights = weights[VOTE_MEDIC], weights[VOTE_DETECTIVE]
+        # (top count, targets at top capped at 2, role at top, impostors, done, fresh, medic, detective) -> weight
+        states = {(-1, 0, None, sum(cls in VOTE_IMPOSTOR_CLASSES for cls in classes), 0, plain_total,
+                   int(VOTE_MEDIC in classes), int(VOTE_DETECTIVE in classes)): 1.0}
+        for handled, target in enumerate(order):
+            is_plain = target in (VOTE_CREWMATE, VOTE_CREWMATE_D)
+            unhandled_plain = plain_total - handled if is_plain else 0
+            role = VOTE_CLASS_ROLES[target]
+            q_impostor, q_plain = impostor_weights[target], plain_weights[target]
+            q_medic, q_detective = medic_weights[target], detective_weights[target]
+            next_states = {}
+            for (top, ties, leader, left_impostors, done, fresh, left_medic, left_detective), p in states.items():
+                # the target's own vote, if still unused, stays with it; by symmetry the handled
+                # crewmate is one of the unused fresh voters whenever there is one
+                own = 1 if is_plain and fresh else 0
+                if is_plain and not own and unhandled_plain == 0:
+                    continue
+                medic_choices = ((0, 1.0), (1, q_medic)) if left_medic and target != VOTE_MEDIC and q_medic else ((0, 1.0),)
+                detective_choices = (((0, 1.0), (1, q_detective))
+                                     if left_detective and target != VOTE_DETECTIVE and q_detective else ((0, 1.0),))
+                impostor_choices = [(k, math.comb(left_impostors, k) * q_impostor ** k)
+                                    for k in range(left_impostors + 1 if q_impostor else 1)]
+                plain_choices = [(k_done, k_fresh, math.comb(done, k_done) * math.comb(fresh - own, k_fresh) * q_plain ** (k_done + k_fresh))
+                                 for k_done in range(done + 1 if q_plain else 1)
+                                 for k_fresh in range(fresh - own + 1 if q_plain else 1)]
+                for k_medic, w_medic in medic_choices:
+                    for k_detective, w_detective in detective_choices:
+                        for k_impostors, w_impostors in impostor_choices:
+                            for k_done, k_fresh, w_plain in plain_choices:
+                                votes = k_medic + k_detective + k_impostors + k_done + k_fresh
+                                if votes > top:
+                                    state_top = (votes, 1, role)
+                                elif votes == top:
+                                    state_top = (top, 2, None)
+                                else:
+                                    state_top = (top, ties, leader)
+                                after = state_top + (left_impostors - k_impostors, done - k_done + own,
+                                                     fresh - own - k_fresh, left_medic - k_medic, left_detective - k_detective)
+                                next_states[after] = next_states.get(after, 0.0) + p * w_medic * w_detective * w_impostors * w_plain
+            states = next_states
+        tally = {}
+        for (top, ties, leader, *left), p in states.items():
+            if not any(left): # every voter cast exactly one vote
+                ejected = leader if ties == 1 else None
+                tally[ejected] = tally.get(ejected, 0.0) + p
+        return tally
+
+
+def cross_check(num_players, num_impostors, games=20000, seed=0, engine="scalar", config=None, workers=None):
+    """Compare ExactSolver with a simulation; the z-scores should sit within a few units of 0."""
+    exact = ExactSolver(config).solve(num_players, num_impostors)
+    stats = run_simulations(games, exact["players"], exact["impostors"], seed, workers, engine, config=config)
+    expected = exact["crew_win_rate"]
+    observed = stats.wins[WINNER_CREW] / stats.games
+    spread = math.sqrt(expected * (1 - expected) / stats.games) or 1.0
+    mean_rounds = sum(rounds * count for rounds, count in stats.round_histogram.items()) / stats.games
+    rounds_variance = sum(p * (rounds - exact["expected_rounds"]) ** 2 for rounds, p in exact["round_distribution"].items())
+    return {"exact": exact, "games": stats.games, "simulated_crew_win_rate": observed,
+            "crew_win_z": (observed - expected) / spread, "simulated_expected_rounds": mean_rounds,
+            "rounds_z": (mean_rounds - exact["expected_rounds"]) / (math.sqrt(rounds_variance / stats.games) or 1.0)}
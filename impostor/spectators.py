@@ -0,0 +1,311 @@
+import time
+
+from .engine import (
+    EVENT_DETECTIVE_CLUE, EVENT_EJECTION, EVENT_HUMAN_VOTE, EVENT_KILL, EVENT_MEDIC_SCAN, EVENT_NOTE,
+    EVENT_ROUND_START, EVENT_VOTE, ROLE_CODES, WINNER_CODES
+)
+from .replay import (
+    REPLAY_CODES, REPLAY_FIELDS, REPLAY_KINDS, Replay, ReplayError, read_varint, record_fields, write_varint
+)
+
+# --- Spectators ---
+# A lobby's public changes are encoded once, as they happen, and the same bytes go to
+# every viewer. On the wire a frame is a varint length then a payload: a kind byte, a
+# varint sequence number and varint fields. Events reuse the replay record codes and
+# fields, minus what players cannot see (medic and detective findings, the human's own
+# vote record), plus what the meeting announces: ejections carry the role revealed,
+# kills and notes their text as a varint length and UTF-8. Alibis and the end of the
+# game have kinds of their own. A keyframe holds who is dead, the roles revealed so far
+# and the frames of the current round, so a viewer joining late starts from the latest
+# keyframe plus the frames after it.
+FRAME_ALIBIS = 0x40
+FRAME_END = 0x41
+FRAME_KEY = 0x42
+SPECTATOR_FIELDS = dict(REPLAY_FIELDS, **{EVENT_MEDIC_SCAN: ("investigator",), EVENT_DETECTIVE_CLUE: ("investigator",),
+                                          EVENT_EJECTION: ("maybe_player", "reason", "maybe_role")})
+SPECTATOR_TEXT = {EVENT_KILL: "task", EVENT_NOTE: "text"}
+SPECTATOR_KEYFRAME_INTERVAL = 16 # frames within a round between keyframes
+SPECTATOR_MAX_BUFFER = 64 * 1024 # bytes queued to one viewer before it waits for the next keyframe
+
+
+def _write_text(out, text):
+    data = text.encode()
+    write_varint(out, len(data))
+    out += data
+
+def _read_text(data, pos):
+    length, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + length]).decode(), pos + length
+
+def _frame(payload):
+    out = bytearray()
+    write_varint(out, len(payload))
+    out += payload
+    return bytes(out)
+
+
+class SpectatorChannel:
+    """Broadcasts one game's public state changes to any number of viewers."""
+    def __init__(self, game, keyframe_interval=SPECTATOR_KEYFRAME_INTERVAL, max_buffer=SPECTATOR_MAX_BUFFER):
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.max_buffer = max_buffer
+        self.viewers = set() # in step with the stream
+        self.stale = set() # to be caught up from the keyframe
+        self.seq = 0
+        self.round_num = 0
+        self.round_frames = [] # this round's frames so far, carried by every keyframe
+        self.since_keyframe = []
+        self.pending = [] # frames not yet flushed to the viewers in step
+        self.keyframe = None
+        self.dead = set()
+        self.revealed = {} # player index -> role code, once public
+        self.closed = False
+        self.frames_encoded = 0
+        self.frames_delivered = 0
+        self.bytes_delivered = 0
+        self.send_seconds = 0.0 # spent writing to viewers
+        self._index = {player: i for i, player in enumerate(game.players)}
+        self.round_num = game.round_num
+        names = {player.name: i for i, player in enumerate(game.players)}
+        for event in game.events.of_kind(EVENT_KILL) + game.events.of_kind(EVENT_EJECTION): # a resumed game's past
+            if event.data[0] is not None:
+                self.dead.add(names[event.data[0].name])
+                self.revealed[names[event.data[0].name]] = ROLE_CODES[event.data[1]]
+        self._keyframe()
+        game.events.subscribe(self._on_event)
+
+    def header(self):
+        """What a viewer needs, besides the frames, to decode them."""
+        return {"players": [p.name for p in self.game.players], "rooms": self.game.ship_map.rooms}
+
+    def __len__(self):
+        return len(self.viewers) + len(self.stale)
+
+    def add(self, writer):
+        """Start streaming to `writer`: the latest keyframe, then everything after it."""
+        if self.closed:
+            writer.close()
+            return
+        self.flush() # so the catch-up and the next flush do not overlap
+        writer.write(self.keyframe + b"".join(self.since_keyframe))
+        self.viewers.add(writer)
+
+    def discard(self, writer):
+        self.viewers.discard(writer)
+        self.stale.discard(writer)
+
+    def _payload(self, kind, fields=()):
+        payload = bytearray((kind,))
+        write_varint(payload, self.seq)
+        self.seq += 1
+        for value in fields:
+            write_varint(payload, value)
+        return payload
+
+    def _on_event(self, event):
+        kind = event.kind
+        if kind == EVENT_HUMAN_VOTE or self.closed:
+            return
+        fields = record_fields(self.game, self._index, event)
+        if kind in (EVENT_MEDIC_SCAN, EVENT_DETECTIVE_CLUE):
+            fields = fields[:1] # the investigation is announced, its target and finding are not
+        elif kind == EVENT_KILL:
+            self.dead.add(fields[0])
+            self.revealed[fields[0]] = fields[1]
+        elif kind == EVENT_EJECTION: # the ejected player's role is announced with them
+            fields += (ROLE_CODES[event.data[1]] + 1 if event.data[0] is not None else 0,)
+            if fields[0]:
+                self.dead.add(fields[0] - 1)
+                self.revealed[fields[0] - 1] = fields[2] - 1
+        payload = self._payload(REPLAY_CODES[kind], fields)
+        if kind in SPECTATOR_TEXT:
+            _write_text(payload, event.data[-1])
+        if kind == EVENT_ROUND_START:
+            self.round_num = event.round
+            self.round_frames = []
+        self.publish(payload)
+        if kind == EVENT_ROUND_START:
+            self._keyframe()
+
+    def alibis(self):
+        """Queue the living players' alibis; call once the meeting opens."""
+        living = sorted(self.game.get_alive_players(), key=lambda p: p.name)
+        room_index = self.game.ship_map.room_index
+        payload = self._payload(FRAME_ALIBIS, (len(living),))
+        for player in living:
+            write_varint(payload, self._index[player])
+            write_varint(payload, room_index[player.alibi_location])
+            _write_text(payload, player.alibi_task)
+        self.publish(payload)
+
+    def end(self):
+        """Send the result and every role to all viewers, then close their connections."""
+        if self.closed:
+            return
+        game = self.game
+        roles = [ROLE_CODES[p.role] for p in game.players]
+        self.publish(self._payload(FRAME_END, [WINNER_CODES[game.winner], int(game.stalemate), game.round_num] + roles))
+        self.flush(force=True) # viewers that fell behind still see the finish
+        self.close()
+
+    def close(self):
+        self.closed = True
+        for writer in self.viewers | self.stale:
+            writer.close() # bytes already buffered are still sent
+        self.viewers.clear()
+        self.stale.clear()
+
+    def publish(self, payload):
+        """Frame `payload` once and queue it for the next flush."""
+        frame = _frame(payload)
+        self.frames_encoded += 1
+        self.round_frames.append(frame)
+        self.since_keyframe.append(frame)
+        self.pending.append(frame)
+        if len(self.since_keyframe) >= self.keyframe_interval:
+            self._keyframe()
+
+    def flush(self, force=False):
+        """Write the queued frames to every viewer in step and catch up the stale ones."""
+        if self.pending:
+            batch = b"".join(self.pending)
+            for writer in self._send(batch, self.viewers, len(self.pending), force):
+                self.viewers.discard(writer)
+                self.stale.add(writer)
+            self.pending = []
+        if self.stale:
+            catch_up = self.keyframe + b"".join(self.since_keyframe)
+            lagging = set(self._send(catch_up, self.stale, len(self.since_keyframe) + 1, force))
+            self.viewers |= self.stale - lagging
+            self.stale = lagging
+
+    def _send(self, data, viewers, frames, force):
+        """Write `data` to each viewer; returns those skipped for a full send buffer."""
+        start = time.perf_counter()
+        lagging = []
+        for writer in viewers:
+            transport = writer.transport
+            if not force and transport.get_write_buffer_size() > self.max_buffer:
+                lagging.append(writer)
+            else:
+                transport.write(data)
+        sent = len(viewers) - len(lagging)
+        self.frames_delivered += sent * frames
+        self.bytes_delivered += sent * len(data)
+        self.send_seconds += time.perf_counter() - start
+        return lagging
+
+    def _keyframe(self):
+        payload = bytearray((FRAME_KEY,))
+        write_varint(payload, self.seq) # the number of the next frame
+        write_varint(payload, self.round_num)
+        write_varint(payload, len(self.game.players))
+        for i in range(len(self.game.players)):
+            write_varint(payload, int(i in self.dead) | (self.revealed.get(i, -1) + 1) << 1)
+        write_varint(payload, len(self.round_frames))
+        for frame in self.round_frames:
+            payload += frame
+        self.keyframe = _frame(payload)
+        self.since_keyframe = []
+
+
+class SpectatorView:
+    """A viewer's copy of a lobby, rebuilt from its frames."""
+    def __init__(self, header):
+        self.names = header["players"]
+        self.rooms = header["rooms"]
+        self.round = 0
+        self.next_seq = None
+        self.alive = [True] * len(self.names)
+        self.roles = [None] * len(self.names)
+        self.result = None
+
+    def apply(self, payload):
+        """Entries for one frame; raises ReplayError if frames were lost in between."""
+        if payload[0] == FRAME_KEY:
+            return self._apply_keyframe(payload)
+        entry = self._decode(payload)
+        if entry["seq"] != self.next_seq:
+            raise ReplayError(f"Expected frame {self.next_seq}, got {entry['seq']}")
+        self.next_seq += 1
+        kind = entry["kind"]
+        if kind == EVENT_ROUND_START:
+            self.round += 1
+        elif kind == EVENT_KILL:
+            self._reveal(entry["victim"], entry["role"])
+        elif kind == EVENT_EJECTION and entry["maybe_player"] is not None:
+            self._reveal(entry["maybe_player"], entry["role"])
+        elif kind == "end":
+            self.result = entry
+            self.roles = [entry["roles"][name] for name in self.names]
+        entry["round"] = self.round
+        return [entry]
+
+    def _reveal(self, name, role):
+        i = self.names.index(name)
+        self.alive[i] = False
+        self.roles[i] = role
+
+    def _apply_keyframe(self, payload):
+        role_names = list(ROLE_CODES)
+        self.next_seq, pos = read_varint(payload, 1)
+        self.round, pos = read_varint(payload, pos)
+        count, pos = read_varint(payload, pos)
+        for i in range(count):
+            state, pos = read_varint(payload, pos)
+            self.alive[i] = not state & 1
+            self.roles[i] = role_names[(state >> 1) - 1] if state >> 1 else None
+        frames, pos = read_varint(payload, pos)
+        entries = [{"round": self.round, "kind": "keyframe", "seq": self.next_seq,
+                    "alive": [name for name, alive in zip(self.names, self.alive) if alive],
+                    "roles": {name: role for name, role in zip(self.names, self.roles) if role is not None}}]
+        for _ in range(frames): # the round so far, already counted in the state above
+            length, pos = read_varint(payload, pos)
+            entry = self._decode(payload[pos:pos + length])
+            entry["round"] = self.round
+            entries.append(entry)
+            pos += length
+        return entries
+
+    def _decode(self, payload):
+        code = payload[0]
+        seq, pos = read_varint(payload, 1)
+        names, rooms = self.names, self.rooms
+        if code == FRAME_ALIBIS:
+            count, pos = read_varint(payload, pos)
+            alibis = {}
+            for _ in range(count):
+                player, pos = read_varint(payload, pos)
+                room, pos = read_varint(payload, pos)
+                task, pos = _read_text(payload, pos)
+                alibis[names[player]] = (rooms[room], task)
+            return {"kind": "alibis", "seq": seq, "alibis": alibis}
+        if code == FRAME_END:
+            values = []
+            while pos < len(payload):
+                value, pos = read_varint(payload, pos)
+                values.append(value)
+            role_names = list(ROLE_CODES)
+            return {"kind": "end", "seq": seq, "winner": list(WINNER_CODES)[values[0]], "stalemate": bool(values[1]),
+                    "rounds": values[2], "roles": {name: role_names[code] for name, code in zip(names, values[3:])}}
+        kind = REPLAY_KINDS[code - 1]
+        entry = {"kind": kind, "seq": seq}
+        if kind == EVENT_VOTE:
+            count, pos = read_varint(payload, pos)
+            votes = {}
+            for _ in range(count):
+                voter, pos = read_varint(payload, pos)
+                target, pos = read_varint(payload, pos)
+                votes[names[voter]] = names[target]
+            entry["votes"] = votes
+            return entry
+        for field in SPECTATOR_FIELDS[kind]:
+            value, pos = read_varint(payload, pos)
+            if field == "maybe_role":
+                entry["role"] = list(ROLE_CODES)[value - 1] if value else None
+            else:
+                entry[field] = Replay._resolve(field, value, names, rooms)
+        if kind in SPECTATOR_TEXT:
+            entry[SPECTATOR_TEXT[kind]], pos = _read_text(payload, pos)
+        return entry
@@ -0,0 +1,131 @@
+import json
+import math
+import os
+from statistics import NormalDist
+
+from .engine import WINNER_CREW, GameConfig, derive_seed, normalize_lobby
+from .simulation import run_simulations
+
+# --- Balance Sweeps ---
+# A sweep point is one GameConfig on one lobby size. Its crew win rate is estimated in
+# fixed-size chunks of games, each seeded with derive_seed(seed, chunk index), and after
+# every chunk the Wilson interval decides whether more games are worth playing.
+
+def wilson_interval(wins, games, confidence=0.95):
+    """Wilson score interval for a win rate of wins/games."""
+    if not games:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = wins / games
+    denominator = 1 + z * z / games
+    centre = (rate + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class SweepCache:
+    """Games and crew wins per evaluated point, appended to a JSON-lines file."""
+    def __init__(self, path=None):
+        self.path = path
+        self.points = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError: # a line cut short by an interrupted write
+                        continue
+                    self.points[entry["key"]] = (entry["games"], entry["wins"])
+
+    @staticmethod
+    def key(engine, num_players, num_impostors, seed, chunk, config):
+        return f"{engine}|{num_players}|{num_impostors}|{seed}|{chunk}|{config.key()}"
+
+    def get(self, key):
+        return self.points.get(key, (0, 0))
+
+    def put(self, key, games, wins):
+        self.points[key] = (games, wins)
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "games": games, "wins": wins}) + "\n")
+
+
+def evaluate_point(config, num_players, num_impostors, target=None, tolerance=0.02, confidence=0.95,
+                   precision=0.01, chunk=2000, max_games=200000, engine="scalar", seed=0, cache=None, workers=1):
+    """Play chunks of games until the crew win rate of `config` is known well enough."""
+    cache = cache if cache is not None else SweepCache()
+    key = SweepCache.key(engine, num_players, num_impostors, seed, chunk, config)
+    games, wins = cache.get(key)
+    while True:
+        low, high = wilson_interval(wins, games, confidence)
+        if games and target is not None and target - tolerance <= low and high <= target + tolerance:
+            stop = "inside"
+        elif games and target is not None and low > target + tolerance:
+            stop = "above"
+        elif games and target is not None and high < target - tolerance:
+            stop = "below"
+        elif games and (high - low) / 2 <= precision:
+            stop = "precision"
+        elif games >= max_games:
+            stop = "max_games"
+        else:
+            stats = run_simulations(min(chunk, max_games - games), num_players, num_impostors,
+                                    derive_seed(seed, games // chunk), workers, engine, config=config)
+            games += stats.games
+            wins += stats.wins[WINNER_CREW]
+            cache.put(key, games, wins)
+            continue
+        return {"players": num_players, "impostors": num_impostors, "config": config.changes(), "games": games,
+                "crew_win_rate": wins / games if games else 0.0, "low": low, "high": high, "stop": stop}
+
+
+def run_sweep(grid, lobbies, base=None, target=None, **evaluate):
+    """Evaluate every combination of `grid` ({field: [values]}) on every (players, impostors) lobby."""
+    base = base if base is not None else GameConfig()
+    fields = sorted(grid)
+    combos = [{}]
+    for field in fields:
+        combos = [dict(combo, **{field: value}) for combo in combos for value in grid[field]]
+    results = []
+    for lobby in lobbies:
+        num_players, num_impostors = normalize_lobby(*lobby)
+        points = [evaluate_point(base.replace(**combo), num_players, num_impostors, target=target, **evaluate)
+                  for combo in combos]
+        if target is not None:
+            points.sort(key=lambda point: abs(point["crew_win_rate"] - target))
+        results.extend(points)
+    return results
+
+
+def auto_balance(field, low, high, lobbies, target=0.5, base=None, resolution=0.01, **evaluate):
+    """Bisect one config field between low and high per lobby until the crew win rate hits target."""
+    base = base if base is not None else GameConfig()
+    results = []
+    for lobby in lobbies:
+        num_players, num_impostors = normalize_lobby(*lobby)
+        measure = lambda value: evaluate_point(base.replace(**{field: value}), num_players, num_impostors,
+                                               target=target, **evaluate)
+        at_low, at_high = measure(low), measure(high)
+        rising = at_high["crew_win_rate"] >= at_low["crew_win_rate"]
+        lo, hi = (low, high) if rising else (high, low) # win rate grows from lo towards hi
+        best = min((at_low, at_high), key=lambda point: abs(point["crew_win_rate"] - target))
+        reached = best["stop"] == "inside"
+        evaluations = 2
+        if (at_low["crew_win_rate"] - target) * (at_high["crew_win_rate"] - target) <= 0 and not reached:
+            while abs(hi - lo) > resolution:
+                value = (lo + hi) / 2
+                point = measure(value)
+                evaluations += 1
+                if abs(point["crew_win_rate"] - target) < abs(best["crew_win_rate"] - target):
+                    best = point
+                if point["stop"] == "inside":
+                    break
+                if point["crew_win_rate"] < target:
+                    lo = value
+                else:
+                    hi = value
+            reached = True
+        results.append({"field": field, "value": best["config"].get(field, GameConfig.FIELDS[field]),
+                        "reached": reached, "evaluations": evaluations, **best})
+    return results
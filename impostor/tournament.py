@@ -0,0 +1,69 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import STRATEGIES, WINNER_CREW, Game, derive_seed, normalize_lobby, strategies_for
+from .sweeps import wilson_interval
+
+# --- Tournaments ---
+# Every crew strategy meets every impostor strategy on the same deals: batch i of each
+# pairing is seeded with derive_seed(seed, i), so win rates differ only by strategy.
+
+def _tournament_batch(task):
+    """Worker entry point: crew wins over one seeded batch of one pairing."""
+    crew, impostor, num_players, num_impostors, num_games, seed, config = task
+    strategies = strategies_for(crew, impostor)
+    seeds = random.Random(seed)
+    crew_wins = 0
+    for _ in range(num_games):
+        game = Game(num_players, num_impostors, headless=True, seed=seeds.getrandbits(64), config=config,
+                    strategies=strategies)
+        crew_wins += game.simulate().winner == WINNER_CREW
+    return crew, impostor, num_games, crew_wins
+
+
+def run_tournament(names=None, num_players=7, num_impostors=1, games=2000, seed=0, workers=None, batch_size=500,
+                   confidence=0.95, config=None):
+    """Play every (crew strategy, impostor strategy) pairing of `names` for `games` games each."""
+    names = list(names or STRATEGIES)
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategy: {', '.join(unknown)} (known: {', '.join(STRATEGIES)})")
+    num_players, num_impostors = normalize_lobby(num_players, num_impostors)
+    tasks = [(crew, impostor, num_players, num_impostors, min(batch_size, games - start), derive_seed(seed, index), config)
+             for crew in names for impostor in names
+             for index, start in enumerate(range(0, games, batch_size))]
+    played = {} # (crew, impostor) -> [games, crew wins]
+
+    def record(crew, impostor, batch_games, crew_wins):
+        total = played.setdefault((crew, impostor), [0, 0])
+        total[0] += batch_games
+        total[1] += crew_wins
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            record(*_tournament_batch(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for outcome in pool.map(_tournament_batch, tasks, chunksize=max(1, len(tasks) // (4 * workers))):
+                record(*outcome)
+
+    def ranking(side):
+        rows = []
+        for name in names:
+            pairings = [(g, w) for (crew, impostor), (g, w) in played.items() if (crew if side == "crew" else impostor) == name]
+            side_games = sum(g for g, _ in pairings)
+            side_wins = sum(w if side == "crew" else g - w for g, w in pairings)
+            low, high = wilson_interval(side_wins, side_games, confidence)
+            rows.append({"strategy": name, "games": side_games, "win_rate": side_wins / side_games if side_games else 0.0,
+                         "low": low, "high": high})
+        return sorted(rows, key=lambda row: row["win_rate"], reverse=True)
+
+    pairings = []
+    for (crew, impostor), (pair_games, crew_wins) in played.items():
+        low, high = wilson_interval(crew_wins, pair_games, confidence)
+        pairings.append({"crew": crew, "impostor": impostor, "games": pair_games,
+                         "crew_win_rate": crew_wins / pair_games if pair_games else 0.0, "low": low, "high": high})
+    return {"players": num_players, "impostors": num_impostors, "seed": seed, "pairings": pairings,
+            "crew": ranking("crew"), "impostor": ranking("impostor")}
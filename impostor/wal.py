@@ -0,0 +1,384 @@
+import asyncio
+import json
+import os
+import time
+import zlib
+
+from .engine import Game, derive_seed
+from .replay import GameRecorder, Replay, pack_recording, read_varint, write_varint
+
+# --- Write-Ahead Log ---
+# Running lobbies are journaled so a restarted server can pick them up again. The log is
+# a directory of segments (wal-<n>.log: WAL_MAGIC, a version byte, then entries) and at
+# most one live snapshot (snapshot-<n>.bin: SNAPSHOT_MAGIC, a version byte, a varint-length
+# JSON header, then entries) holding every lobby still open when segment n was started.
+# An entry is a varint lobby id, a kind byte, a varint-length payload and the CRC-32 of
+# all of that (4 bytes, little-endian). A lobby opens with its recording header, grows
+# by replay records and closes when its game is over; a round entry marks the point it
+# is restored to. Recovery reads the snapshot, then the segments after it, and stops at
+# the first torn or corrupt entry of the last one.
+WAL_MAGIC = b"IMPW"
+SNAPSHOT_MAGIC = b"IMPS"
+WAL_VERSION = 1
+WAL_OPEN, WAL_RECORDS, WAL_ROUND, WAL_CLOSE = 1, 2, 3, 4
+WAL_SNAPSHOT_BYTES = 4 * 1024 * 1024 # segment size that triggers a snapshot and a new segment
+
+
+class JournalError(ValueError):
+    """A write-ahead log directory is damaged beyond its last segment's tail."""
+
+
+def _wal_entry(lobby_id, kind, payload):
+    out = bytearray()
+    write_varint(out, lobby_id)
+    out.append(kind)
+    write_varint(out, len(payload))
+    out += payload
+    out += zlib.crc32(out).to_bytes(4, "little")
+    return out
+
+def _varint_bytes(value):
+    out = bytearray()
+    write_varint(out, value)
+    return out
+
+def _read_wal_entries(data, pos):
+    """Yield (lobby id, kind, payload, end offset) until the data ends or an entry is torn."""
+    while pos < len(data):
+        start = pos
+        try:
+            lobby_id, pos = read_varint(data, pos)
+            kind = data[pos]
+            length, pos = read_varint(data, pos + 1)
+        except IndexError:
+            return
+        end = pos + length
+        if end + 4 > len(data) or zlib.crc32(data[start:end]) != int.from_bytes(data[end:end + 4], "little"):
+            return
+        yield lobby_id, kind, data[pos:end], end + 4
+        pos = end + 4
+
+def _fsync_directory(path):
+    if hasattr(os, "O_DIRECTORY"): # so renames and new files survive a crash too
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class LobbyJournal:
+    """One open lobby as the log knows it: its recording so far and the last committed round."""
+    __slots__ = ("lobby_id", "header", "body", "committed", "rounds")
+
+    def __init__(self, lobby_id, header):
+        self.lobby_id = lobby_id
+        self.header = header # the recording header, JSON-encoded
+        self.body = bytearray()
+        self.committed = 0 # body length at the last round entry
+        self.rounds = 0
+
+    def entries(self):
+        """The entries that rebuild this journal, as written into a snapshot."""
+        out = _wal_entry(self.lobby_id, WAL_OPEN, self.header)
+        if self.committed:
+            out += _wal_entry(self.lobby_id, WAL_RECORDS, self.body[:self.committed])
+        if self.rounds:
+            out += _wal_entry(self.lobby_id, WAL_ROUND, _varint_bytes(self.rounds))
+        if len(self.body) > self.committed:
+            out += _wal_entry(self.lobby_id, WAL_RECORDS, self.body[self.committed:])
+        return out
+
+    def replay(self):
+        """The committed part of the recording as a Replay."""
+        return Replay(pack_recording(self.header, self.body[:self.committed]))
+
+    def restore(self, renderer=None):
+        """A live Game at the start of the first round not yet committed."""
+        return self.replay().resume(self.rounds + 1, renderer)
+
+
+class WriteAheadLog:
+    """Durable journal of every running lobby, with group-committed fsyncs."""
+    def __init__(self, directory, commit_delay=0.0, snapshot_bytes=WAL_SNAPSHOT_BYTES):
+        self.directory = directory
+        self.commit_delay = commit_delay # hold each batch open this much longer to gather more
+        self.snapshot_bytes = snapshot_bytes # segment size past which open lobbies are snapshotted
+        self.journals = {} # lobby id -> LobbyJournal, open lobbies only
+        self.next_lobby_id = 1
+        self.segment = 0
+        self.segment_bytes = 0
+        self.buffer = bytearray() # entries not yet handed to the flusher
+        self.buffered_entries = 0
+        self.buffered_records = 0
+        self.records_committed = 0
+        self.entries_committed = 0
+        self.syncs = 0
+        self.snapshots = 0
+        self.sync_seconds = 0.0
+        self._file = None
+        self._wakeup = None
+        self._flusher = None
+        self._next = None # resolved once the batch now gathering is on disk
+        self._inflight = None # the same, for the batch being written
+        self._error = None
+        self._recovered = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, prefix, index, suffix):
+        return os.path.join(self.directory, f"{prefix}-{index:06d}{suffix}")
+
+    def _files(self, prefix, suffix):
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix + "-") and name.endswith(suffix):
+                try:
+                    found.append(int(name[len(prefix) + 1:-len(suffix)]))
+                except ValueError:
+                    pass
+        return sorted(found)
+
+    # Recovery
+
+    def recover(self):
+        """Load the journal of every lobby that was still open; {lobby id: LobbyJournal}."""
+        snapshots = self._files("snapshot", ".bin")
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            with open(self._path("snapshot", base, ".bin"), "rb") as f:
+                data = f.read()
+            if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or data[len(SNAPSHOT_MAGIC)] != WAL_VERSION:
+                raise JournalError(f"Snapshot {base} is not a version {WAL_VERSION} lobby snapshot")
+            length, pos = read_varint(data, len(SNAPSHOT_MAGIC) + 1)
+            header = json.loads(bytes(data[pos:pos + length]))
+            self.next_lobby_id = header["next_lobby"]
+            end = self._apply(data, pos + length)
+            if end != len(data):
+                raise JournalError(f"Snapshot {base} is damaged")
+        segments = [index for index in self._files("wal", ".log") if index >= base]
+        for index in segments:
+            path = self._path("wal", index, ".log")
+            with open(path, "rb") as f:
+                data = f.read()
+            if data[:len(WAL_MAGIC)] != WAL_MAGIC:
+                if index != segments[-1] or len(data) > len(WAL_MAGIC) + 1:
+                    raise JournalError(f"Segment {index} is not a lobby log")
+                continue # created, but its header never reached the disk
+            end = self._apply(data, len(WAL_MAGIC) + 1)
+            if end != len(data) and index != segments[-1]:
+                raise JournalError(f"Segment {index} is damaged before the end of the log")
+        for journal in self.journals.values():
+            del journal.body[journal.committed:]
+        self.segment = max(segments + [base])
+        self._rotate()
+        self._recovered = True
+        return dict(self.journals)
+
+    def _apply(self, data, pos):
+        """Apply the entries from `pos` on; returns where the last whole entry ends."""
+        journals = self.journals
+        for lobby_id, kind, payload, pos in _read_wal_entries(data, pos):
+            if kind == WAL_OPEN:
+                journals[lobby_id] = LobbyJournal(lobby_id, bytes(payload))
+                self.next_lobby_id = max(self.next_lobby_id, lobby_id + 1)
+            elif kind == WAL_CLOSE:
+                journals.pop(lobby_id, None)
+            elif lobby_id in journals:
+                journal = journals[lobby_id]
+                if kind == WAL_RECORDS:
+                    journal.body += payload
+                elif kind == WAL_ROUND:
+                    journal.rounds = read_varint(payload, 0)[0]
+                    journal.committed = len(journal.body)
+        return pos
+
+    # Appending
+
+    def open_lobby(self, lobby_id, header):
+        """Start journaling a lobby; `header` is its recording header (GameRecorder.header())."""
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        self.journals[lobby_id] = LobbyJournal(lobby_id, encoded)
+        self.next_lobby_id = max(self.next_lobby_id, lobby_id + 1)
+        self._append(lobby_id, WAL_OPEN, encoded)
+
+    def record(self, lobby_id, record):
+        """Append replay records; pass as GameRecorder's on_record."""
+        self.journals[lobby_id].body += record
+        self.buffered_records += 1
+        self._append(lobby_id, WAL_RECORDS, record)
+
+    def end_round(self, lobby_id, round_num):
+        """Mark everything recorded so far as the state the lobby is restored to."""
+        journal = self.journals[lobby_id]
+        journal.rounds = round_num
+        journal.committed = len(journal.body)
+        self._append(lobby_id, WAL_ROUND, _varint_bytes(round_num))
+
+    def close_lobby(self, lobby_id):
+        if self.journals.pop(lobby_id, None) is not None:
+            self._append(lobby_id, WAL_CLOSE, b"")
+
+    def _append(self, lobby_id, kind, payload):
+        self.buffer += _wal_entry(lobby_id, kind, payload)
+        self.buffered_entries += 1
+
+    # Committing
+
+    async def start(self):
+        """Start the flusher, recovering the directory first if that has not been done."""
+        if not self._recovered:
+            self.recover()
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.ensure_future(self._flush_loop())
+        return self
+
+    async def commit(self):
+        """Wait until everything appended so far is on disk."""
+        if self._error is not None:
+            raise self._error
+        if self.buffer:
+            if self._next is None:
+                self._next = asyncio.get_running_loop().create_future()
+                self._wakeup.set()
+            await asyncio.shield(self._next)
+        elif self._inflight is not None:
+            await asyncio.shield(self._inflight)
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.commit_delay > 0:
+                await asyncio.sleep(self.commit_delay)
+            batch, entries, records = self.buffer, self.buffered_entries, self.buffered_records
+            self.buffer, self.buffered_entries, self.buffered_records = bytearray(), 0, 0
+            self._inflight, self._next = self._next, None
+            snapshot = self._snapshot() if self.segment_bytes + len(batch) >= self.snapshot_bytes else None
+            try:
+                await loop.run_in_executor(None, self._write, batch, snapshot)
+            except Exception as error: # the disk can no longer be trusted; fail every commit from now on
+                self._error = error
+                self._inflight.set_exception(error)
+                return
+            self.entries_committed += entries
+            self.records_committed += records
+            self._inflight.set_result(None)
+            self._inflight = None
+
+    def _write(self, batch, snapshot=None):
+        """Write and fsync one batch (in a worker thread), then snapshot if one is due."""
+        start = time.perf_counter()
+        self._file.write(batch)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.sync_seconds += time.perf_counter() - start
+        self.syncs += 1
+        self.segment_bytes += len(batch)
+        if snapshot is not None:
+            self._rotate(snapshot)
+
+    def _snapshot(self):
+        header = json.dumps({"next_lobby": self.next_lobby_id}, separators=(",", ":")).encode()
+        out = bytearray(SNAPSHOT_MAGIC)
+        out.append(WAL_VERSION)
+        write_varint(out, len(header))
+        out += header
+        for journal in self.journals.values():
+            out += journal.entries()
+        return bytes(out)
+
+    def _rotate(self, snapshot=None):
+        """Start the next segment, snapshot everything before it, then drop what the snapshot replaces."""
+        if snapshot is None:
+            snapshot = self._snapshot()
+        self.segment += 1
+        segment = open(self._path("wal", self.segment, ".log"), "wb")
+        segment.write(WAL_MAGIC + bytes((WAL_VERSION,)))
+        segment.flush()
+        os.fsync(segment.fileno())
+        path = self._path("snapshot", self.segment, ".bin")
+        with open(path + ".tmp", "wb") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        _fsync_directory(self.directory)
+        if self._file is not None:
+            self._file.close()
+        self._file = segment
+        self.segment_bytes = 0
+        self.snapshots += 1
+        for prefix, suffix in (("wal", ".log"), ("snapshot", ".bin")):
+            for index in self._files(prefix, suffix):
+                if index < self.segment:
+                    os.remove(self._path(prefix, index, suffix))
+
+    async def close(self):
+        """Commit what is buffered, stop the flusher and close the segment."""
+        if self._flusher is not None:
+            await self.commit()
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self):
+        return {"open_lobbies": len(self.journals), "entries_committed": self.entries_committed,
+                "records_committed": self.records_committed, "syncs": self.syncs, "snapshots": self.snapshots,
+                "sync_seconds": self.sync_seconds, "segment": self.segment}
+
+
+async def bench_wal(directory, lobbies=200, games=2000, num_players=7, num_impostors=1, seed=0, commit_delay=0.0):
+    """Journal headless games over concurrent lobbies, then time recovering the ones left open."""
+    wal = await WriteAheadLog(directory, commit_delay).start()
+
+    async def play(index, stop_after=None):
+        lobby_id = wal.next_lobby_id
+        game = Game(num_players, num_impostors, headless=True, seed=derive_seed(seed, index))
+        recorder = GameRecorder(game, on_record=lambda record: wal.record(lobby_id, record))
+        wal.open_lobby(lobby_id, recorder.header())
+        game._assign_roles()
+        while not game.game_over and (stop_after is None or game.round_num < stop_after):
+            game._advance_round()
+            wal.end_round(lobby_id, game.round_num)
+            await wal.commit()
+        if game.game_over:
+            wal.close_lobby(lobby_id)
+            await wal.commit()
+        return lobby_id, game
+
+    async def worker(indices):
+        for index in indices:
+            await play(index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(range(slot, games, lobbies)) for slot in range(lobbies)])
+    elapsed = time.perf_counter() - start
+    played = wal.stats()
+    in_flight = {lobby_id: game for lobby_id, game in
+                 await asyncio.gather(*[play(games + slot, stop_after=1) for slot in range(lobbies)])
+                 if not game.game_over}
+    await wal.close()
+
+    start = time.perf_counter()
+    recovered = WriteAheadLog(directory)
+    restored = {lobby_id: journal.restore() for lobby_id, journal in recovered.recover().items()}
+    recovery = time.perf_counter() - start
+    await recovered.close()
+    matching = sum(1 for lobby_id, game in in_flight.items() if lobby_id in restored
+                   and [p.is_alive for p in restored[lobby_id].players] == [p.is_alive for p in game.players]
+                   and restored[lobby_id].round_num == game.round_num)
+    return {"lobbies": lobbies, "games": games, "elapsed": elapsed, "records_committed": played["records_committed"],
+            "entries_committed": played["entries_committed"], "syncs": played["syncs"],
+            "snapshots": played["snapshots"],
+            "records_per_second": played["records_committed"] / elapsed if elapsed > 0 else float("inf"),
+            "records_per_sync": played["records_committed"] / played["syncs"] if played["syncs"] else 0.0,
+            "sync_ms": played["sync_seconds"] / played["syncs"] * 1000 if played["syncs"] else 0.0,
+            "in_flight": len(in_flight), "restored": len(restored), "restored_matching": matching,
+            "recovery_seconds": recovery}
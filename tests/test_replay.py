@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from impostor.engine import Game, TaskEngine
+from impostor.replay import REPLAY_VERSION, GameRecorder, Replay, ReplayError
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Saved with GameRecorder.save() after Game.simulate(); they must keep verifying to the
+# same outcome, so a format or rules change cannot quietly strand saved recordings.
+GOLDEN = [
+    ("seed5-5p1i.rec", "Impostors", 3), # Game(5, 1, headless=True, seed=5)
+    ("seed17-7p1i-tasks.rec", "Crewmates", 2), # Game(7, 1, headless=True, seed=17, tasks=TaskEngine())
+]
+
+
+def record(num_players, num_impostors, seed, tasks=None):
+    game = Game(num_players, num_impostors, headless=True, seed=seed, tasks=tasks)
+    recorder = GameRecorder(game)
+    result = game.simulate()
+    return recorder.getvalue(), result
+
+
+@pytest.mark.parametrize("name, winner, rounds", GOLDEN)
+def test_golden_recordings_still_verify(name, winner, rounds):
+    result = Replay.load(os.path.join(FIXTURES, name)).verify()
+    assert (result.winner, result.rounds) == (winner, rounds)
+
+
+@pytest.mark.parametrize("num_players, num_impostors, with_tasks", [(7, 1, False), (10, 2, True)])
+def test_recording_round_trip(num_players, num_impostors, with_tasks):
+    tasks = TaskEngine() if with_tasks else None
+    data, result = record(num_players, num_impostors, 17, tasks) # three rounds or more either way
+    replay = Replay(data)
+    assert vars(replay.verify()) == vars(result)
+    assert replay.rounds == result.rounds
+    assert replay.decisions(0)[0]["kind"] == "roles"
+    assert vars(replay.resume(3).play_out()) == vars(result)
+
+
+def test_saved_recording_loads(tmp_path):
+    game = Game(7, 1, headless=True, seed=3)
+    recorder = GameRecorder(game)
+    result = game.simulate()
+    recorder.save(tmp_path / "game.rec")
+    assert vars(Replay.load(tmp_path / "game.rec").verify()) == vars(result)
+
+
+def test_damaged_recording_is_rejected():
+    data, _ = record(7, 1, 17)
+    damaged = bytearray(data)
+    damaged[-2] ^= 0x01
+    with pytest.raises(ReplayError):
+        Replay(bytes(damaged)).verify()
+
+
+def test_truncated_recording_is_rejected():
+    data, _ = record(7, 1, 17)
+    with pytest.raises(ReplayError):
+        Replay(data[:-1]).verify()
+
+
+def test_other_formats_are_rejected():
+    data, _ = record(7, 1, 17)
+    with pytest.raises(ReplayError):
+        Replay(b"XXXX" + data[4:])
+    with pytest.raises(ReplayError):
+        Replay(data[:4] + bytes((REPLAY_VERSION + 1,)) + data[5:])
@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import pytest
+
+from impostor.engine import Game
+from impostor.replay import GameRecorder
+from impostor.wal import JournalError, WriteAheadLog
+
+
+def played(seed):
+    """A finished 7-player game as (recording header, [(round, record)], {round: alive flags after it})."""
+    game = Game(7, 1, headless=True, seed=seed)
+    records, alive = [], {}
+
+    def on_record(record):
+        records.append((game.round_num, record))
+        alive[game.round_num] = [p.is_alive for p in game.players]
+
+    recorder = GameRecorder(game, on_record=on_record)
+    game.simulate()
+    return recorder.header(), records, alive
+
+
+async def journal(wal, lobby_id, game, rounds):
+    """Journal the game's first `rounds` rounds, committing each; closes the lobby if that was all of it."""
+    header, records, alive = game
+    wal.open_lobby(lobby_id, header)
+    for round_num in range(1, rounds + 1):
+        for record_round, record in records:
+            if record_round == round_num:
+                wal.record(lobby_id, record)
+        wal.end_round(lobby_id, round_num)
+        await wal.commit()
+    if rounds == max(alive):
+        wal.close_lobby(lobby_id)
+        await wal.commit()
+
+
+def recover(directory):
+    """{lobby id: (round, alive flags)} of every restored lobby."""
+    wal = WriteAheadLog(directory)
+    journals = wal.recover()
+    asyncio.run(wal.close())
+    for journal in journals.values():
+        assert len(journal.body) == journal.committed # nothing past the last round survives
+    games = {lobby_id: journal.restore() for lobby_id, journal in journals.items()}
+    return {lobby_id: (game.round_num, [p.is_alive for p in game.players]) for lobby_id, game in games.items()}
+
+
+def newest(directory, prefix):
+    return os.path.join(directory, max(name for name in os.listdir(directory) if name.startswith(prefix + "-")))
+
+
+def test_open_lobbies_recover_across_snapshots(tmp_path):
+    games = {lobby_id: played(seed) for lobby_id, seed in enumerate((2, 3, 4, 5, 6, 7, 8, 17), 1)}
+    expected = {}
+
+    async def run():
+        wal = await WriteAheadLog(tmp_path, snapshot_bytes=1024).start()
+        for lobby_id, game in games.items():
+            rounds = min(2, max(game[2])) # finished games close; the rest stay open after round 2
+            await journal(wal, lobby_id, game, rounds)
+            if rounds < max(game[2]):
+                expected[lobby_id] = (rounds, game[2][rounds])
+        snapshots = wal.stats()["snapshots"]
+        await wal.close()
+        return snapshots
+
+    assert asyncio.run(run()) > 1
+    assert expected
+    assert recover(tmp_path) == expected
+
+
+def test_torn_final_segment_is_cut_back_to_the_last_round(tmp_path):
+    first, last = played(8), played(17) # three and four rounds
+
+    async def run():
+        wal = await WriteAheadLog(tmp_path).start()
+        await journal(wal, 1, first, 2)
+        await journal(wal, 2, last, 3)
+        await wal.close()
+
+    asyncio.run(run())
+    path = newest(tmp_path, "wal") # ends with lobby 2's round 3 entry
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 2)
+    expected = {1: (2, first[2][2]), 2: (2, last[2][2])}
+    assert recover(tmp_path) == expected
+    assert recover(tmp_path) == expected # the cut-back was made durable
+
+
+def test_damaged_snapshot_is_refused(tmp_path):
+    async def run():
+        wal = await WriteAheadLog(tmp_path).start()
+        await journal(wal, 1, played(17), 2)
+        await wal.close()
+
+    asyncio.run(run())
+    recover(tmp_path) # writes a snapshot of the open lobby
+    path = newest(tmp_path, "snapshot")
+    with open(path, "r+b") as f:
+        data = bytearray(f.read())
+        data[-1] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+    with pytest.raises(JournalError):
+        WriteAheadLog(tmp_path).recover()